@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Gaia Protocol Performance Benchmarks
+Sweeps the Python simulation stack over its real scale parameters with fixed seeds and warmup,
+stores JSON results and flags regressions against a saved baseline. Runs fully offline:
+weather/NASA/oracle HTTP calls are answered by local stand-ins.
+
+Usage (from the repo root):
+    python benchmarks/run_benchmarks.py                  # Run and compare to benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline  # Record a new baseline
+    python benchmarks/run_benchmarks.py --quick --only merkle_build,log_query
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+class OfflineResponse:
+    """Local stand-in for weather/NASA/oracle HTTP responses."""
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+def install_offline_stand_ins():
+    """Route every requests.get/post through local stand-ins so no benchmark touches the network."""
+    try:
+        import requests
+    except ImportError:
+        return  # Nothing imports it then, so nothing can reach the network through it
+    requests.get = lambda url, *args, **kwargs: OfflineResponse(200, {"main": {"temp": 293.15, "humidity": 50}, "wind": {"speed": 3.0}})
+    requests.post = lambda url, *args, **kwargs: OfflineResponse(200, {"status": "success", "url": url})
+
+def seed_everything(seed):
+    """Seed the global RNGs; components with their own Generator get a seed drawn via component_seed()."""
+    random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed)
+    except ImportError:
+        pass
+
+_cleanups = []  # Callables run by run_suite once the current case has been measured
+
+def register_cleanup(fn):
+    _cleanups.append(fn)
+    return fn
+
+def bench_workdir():
+    """Scratch directory for one case, removed as soon as the case is measured."""
+    workdir = tempfile.TemporaryDirectory(prefix="gaia_bench_")
+    register_cleanup(workdir.cleanup)
+    return workdir.name
+
+def run_cleanups():
+    while _cleanups:
+        _cleanups.pop()()
+
+def component_seed():
+    return random.getrandbits(32)  # Follows --seed through seed_everything
+
+def measure(fn, warmup, repeat):
+    """Time fn() `repeat` times after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "min": times[0],
+        "max": times[-1],
+        "p95": times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))],
+        "repeat": repeat
+    }
+
+# Benchmark cases: each builder takes the swept value and returns (fn, units_per_call)
+
+def bench_iot_tick(num_sensors):
+    from simulations.iot_simulator import IoTSimulator
+    simulator = IoTSimulator(num_sensors=num_sensors, seed=component_seed())
+
+    def tick():
+        simulator.data_stream = asyncio.Queue()  # Nobody consumes the stream here
+        asyncio.run(simulator.simulate_tracking())
+    return tick, num_sensors
+
+def bench_env_step(num_regions, steps=100):
+    import numpy as np
+    from simulations.ai_optimizer import PlanetaryResourceEnv
+    env = PlanetaryResourceEnv(num_regions=num_regions, seed=component_seed())
+    env.reset()
+    action = np.random.uniform(0, 1, env.action_space.shape).astype(np.float32)
+
+    def run_steps():
+        for _ in range(steps):
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+    return run_steps, steps
+
+def bench_ledger_sync(nodes):
+    from simulations.quantum_ledger import QuantumLedger
+    ledger = QuantumLedger(nodes=nodes, seed=component_seed())
+    nodes_data = {f"region_{i}": {"water": random.uniform(1e3, 1e6), "energy": random.uniform(1e3, 1e6),
+                                  "minerals": random.uniform(1e3, 1e6)} for i in range(nodes)}
+    return lambda: ledger.multi_node_sync(nodes_data), nodes
+
+def bench_ledger_sync_sharded(nodes, shards=4):
+    from simulations.quantum_ledger import QuantumLedger
+    ledger = QuantumLedger(nodes=nodes, seed=component_seed(), shard_workers=shards)
+    register_cleanup(ledger.close)  # Stop the shard worker processes after the case
+    nodes_data = {f"shard{i % shards}_node{i}": {"water": random.uniform(1e3, 1e6), "energy": random.uniform(1e3, 1e6),
+                                                 "minerals": random.uniform(1e3, 1e6)} for i in range(nodes)}
+    return lambda: ledger.multi_node_sync(nodes_data, hierarchical=True), nodes
+
+def _leftmost_proof(leaves):
+    """Sibling path for leaf 0, the layout DataHelpers.validate_merkle_proof checks."""
+    hashes = [hashlib.sha256(d.encode()).hexdigest() for d in leaves]
+    proof = []
+    while len(hashes) > 1:
+        if len(hashes) % 2 == 1:
+            hashes.append(hashes[-1])
+        proof.append(hashes[1])
+        hashes = [hashlib.sha256((hashes[i] + hashes[i + 1]).encode()).hexdigest() for i in range(0, len(hashes), 2)]
+    return proof
+
+def bench_merkle_build(leaves):
+    from utils.dataHelpers import DataHelpers
+    data = [f"leaf_{i}_{random.random()}" for i in range(leaves)]
+    return lambda: DataHelpers.build_merkle_tree(data), leaves
+
+def bench_merkle_proof(leaves):
+    from utils.dataHelpers import DataHelpers
+    data = [f"leaf_{i}_{random.random()}" for i in range(leaves)]
+    root = DataHelpers.build_merkle_tree(data)
+    proof = _leftmost_proof(data)
+
+    def validate():
+        assert DataHelpers.validate_merkle_proof(root, proof, data[0])
+    return validate, 1
+
+def bench_zk_prove_verify(_):
+    from oracles.zk_validator import ZKValidator
+    validator = ZKValidator()
+    merkle_root = hashlib.sha256(b"gaia").hexdigest()
+
+    def prove_verify():
+        proof = validator.prove_data_integrity({"water": random.uniform(0, 1e6)}, merkle_root)
+        validator.verify_proof(proof, merkle_root)
+    return prove_verify, 1
+
+def bench_log_query(log_entries):
+    from monitoring.logs import LogAggregator
+    log_file = os.path.join(bench_workdir(), "gaia_logs.json")
+    aggregator = LogAggregator(log_file=log_file, batch_size=4096, max_queue=log_entries + 1)
+    for i in range(log_entries):
+        if i % 10 == 0:
+            aggregator.log_event('iot_anomaly', {'sensor': f'sensor_{i}', 'score': random.random()})
+        else:
+            aggregator.log_event('quantum_sync', {'latency': random.uniform(0, 5)})
+    aggregator.close()
+    return aggregator.aggregate_anomalies, log_entries
+
+def write_synthetic_history(path, target_mb, seed=2065, rows_per_chunk=1_000_000):
+    """Synthetic historical_allocations.csv of roughly `target_mb` megabytes, written in chunks."""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    regions = np.array(["earth_north_america", "earth_africa", "earth_europe", "earth_asia", "mars_colony"])
+    start, header = np.datetime64("2023-01-01T00:00:00"), True
+    with open(path, "w") as f:
+        while f.tell() < target_mb * 1e6:
+            n = rows_per_chunk
+            chunk = pd.DataFrame({
+                "timestamp": (start + np.arange(n).astype("timedelta64[m]")).astype(str),
+                "region": regions[rng.integers(0, len(regions), n)],
+                "water_allocated": rng.uniform(1e3, 1e5, n).round(2),
+                "energy_allocated": rng.uniform(1e3, 5e4, n).round(2),
+                "miners_allocated": rng.uniform(1e3, 5e4, n).round(2),
+                "efficiency_score": rng.uniform(0.5, 1.0, n).round(3)
+            })
+            chunk.to_csv(f, header=header, index=False)
+            start, header = start + np.timedelta64(n, "m"), False
+    return path
+
+def bench_history_ingest(target_mb):
+    from data.historical_store import HistoricalStore
+    workdir = bench_workdir()
+    csv_path = write_synthetic_history(os.path.join(workdir, "history.csv"), target_mb)
+    store_dir = os.path.join(workdir, "store")
+
+    def ingest():
+        shutil.rmtree(store_dir, ignore_errors=True)  # Fresh store each run; only one copy on disk at a time
+        HistoricalStore(store_dir).ingest_csv(csv_path)
+    return ingest, os.path.getsize(csv_path) / 1e6  # units_per_sec = MB/s
+
+def bench_history_batch(target_mb, batch_size=256, length=64):
+    import numpy as np
+    from data.historical_store import HistoricalStore
+    workdir = bench_workdir()
+    store = HistoricalStore(os.path.join(workdir, "store"))
+    store.ingest_csv(write_synthetic_history(os.path.join(workdir, "history.csv"), target_mb))
+    store = HistoricalStore(store.store_dir)  # Fresh memory maps, as a training process would open them
+    rng = np.random.default_rng(2065)
+    return lambda: store.sample_windows(batch_size, length, rng), batch_size  # units_per_sec = windows/s
+
+def bench_cold_start(num_sensors, train_timesteps=8192):
+    from simulations.iot_simulator import IoTSimulator
+    from simulations.ai_optimizer import ResourceOptimizer
+
+    seed = component_seed()
+
+    def cold_start():
+        simulator = IoTSimulator(num_sensors=num_sensors, seed=seed)
+        asyncio.run(simulator.simulate_tracking())
+        optimizer = ResourceOptimizer(seed=seed)
+        optimizer.model.learn(total_timesteps=train_timesteps)  # One PPO rollout/update cycle, no files written
+    return cold_start, num_sensors
+
+def bench_warm_start(num_sensors):
+    from simulations.iot_simulator import IoTSimulator
+    from simulations.ai_optimizer import ResourceOptimizer
+    from simulations.snapshot import save_snapshot, load_snapshot
+    seed = component_seed()
+    simulator = IoTSimulator(num_sensors=num_sensors, seed=seed)
+    asyncio.run(simulator.simulate_tracking())
+    path = save_snapshot(os.path.join(bench_workdir(), "snapshot.bin"),
+                         simulator=simulator, optimizer=ResourceOptimizer(seed=seed))
+    return lambda: load_snapshot(path), num_sensors
+
+def bench_bulk_messages(payload_bytes, messages=1000):
+    from security.bulk_encryption import BulkSession
+    session = BulkSession.create(os.urandom(32))  # KEM exchange is per session, so it is left out of the loop
+    payloads = [os.urandom(payload_bytes) for _ in range(messages)]
+
+    def seal_batch():
+        for payload in payloads:
+            session.encrypt_message(payload)
+    return seal_batch, payload_bytes * messages / 1e6  # units_per_sec = MB/s
+
+def bench_bulk_stream(size_mb):
+    import io
+    from security.bulk_encryption import BulkSession
+    session = BulkSession.create(os.urandom(32))
+    snapshot = os.urandom(int(size_mb * 1e6))
+
+    def seal_stream():
+        session.encrypt_stream(io.BytesIO(snapshot), io.BytesIO())
+    return seal_stream, size_mb  # units_per_sec = MB/s
+
+# name -> (parameter, full sweep, quick sweep, builder)
+CASES = {
+    "iot_tick": ("num_sensors", [10, 100, 1000], [10, 100], bench_iot_tick),
+    "env_step": ("num_regions", [3, 10, 50], [3, 10], bench_env_step),
+    "ledger_sync": ("nodes", [2, 5, 10], [2, 5], bench_ledger_sync),
+    "ledger_sync_sharded": ("nodes", [8, 40, 200], [8], bench_ledger_sync_sharded),
+    "merkle_build": ("leaves", [100, 1000, 10000, 100000], [100, 1000], bench_merkle_build),
+    "merkle_proof": ("leaves", [100, 1000, 10000, 100000], [100, 1000], bench_merkle_proof),
+    "zk_prove_verify": ("proofs", [1], [1], bench_zk_prove_verify),
+    "log_query": ("log_entries", [1000, 10000, 100000], [1000, 10000], bench_log_query),
+    "history_ingest": ("csv_mb", [64, 1024], [16], bench_history_ingest),
+    "history_batch": ("csv_mb", [64, 1024], [16], bench_history_batch),
+    "cold_start": ("num_sensors", [100, 1000, 10000], [100], bench_cold_start),
+    "warm_start": ("num_sensors", [100, 1000, 10000], [100], bench_warm_start),
+    "bulk_messages": ("payload_bytes", [64, 1024, 65536], [64, 1024], bench_bulk_messages),
+    "bulk_stream": ("size_mb", [16, 256], [16], bench_bulk_stream),
+}
+MAX_REPEAT = {"history_ingest": 2, "cold_start": 2}  # Expensive cases: no warmup, few repeats
+
+def run_suite(only=None, quick=False, warmup=2, repeat=10, seed=2065, history_mb=None):
+    install_offline_stand_ins()
+    results = {}
+    for name, (param, sweep, quick_sweep, builder) in CASES.items():
+        if only and name not in only:
+            continue
+        if history_mb and name.startswith("history_"):
+            sweep = quick_sweep = history_mb
+        for value in (quick_sweep if quick else sweep):
+            key = f"{name}[{param}={value}]"
+            seed_everything(seed)
+            try:
+                fn, units = builder(value)
+                case_repeat = min(repeat, MAX_REPEAT.get(name, repeat))
+                stats = measure(fn, 0 if name in MAX_REPEAT else warmup, case_repeat)
+                stats["units_per_sec"] = units / stats["median"] if stats["median"] > 0 else None
+            except Exception as e:  # Missing optional deps or broken component: record and keep going
+                stats = {"error": f"{type(e).__name__}: {e}"}
+            finally:
+                run_cleanups()
+            results[key] = stats
+            print(f"{key:<40} " + (f"median {stats['median'] * 1e3:10.3f} ms" if "median" in stats else stats["error"]))
+    return {
+        "meta": {"timestamp": datetime.utcnow().isoformat(), "python": platform.python_version(),
+                 "platform": platform.platform(), "seed": seed, "warmup": warmup, "repeat": repeat, "quick": quick},
+        "results": results
+    }
+
+def compare_to_baseline(current, baseline, threshold=0.25):
+    """Flag cases whose median slowed down by more than `threshold` relative to the baseline."""
+    regressions = []
+    for key, stats in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base or "median" not in base or "median" not in stats:
+            continue
+        ratio = stats["median"] / base["median"]
+        stats["baseline_median"] = base["median"]
+        stats["ratio"] = ratio
+        if ratio > 1 + threshold:
+            regressions.append({"case": key, "baseline": base["median"], "current": stats["median"], "ratio": ratio})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Gaia Protocol performance benchmarks")
+    parser.add_argument("--only", help="Comma-separated case names (%s)" % ", ".join(CASES))
+    parser.add_argument("--quick", action="store_true", help="Smaller sweeps for a fast smoke run")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=2065)
+    parser.add_argument("--history-mb", type=lambda v: [int(x) for x in v.split(",")],
+                        help="Synthetic history sizes in MB for history_* cases, e.g. 2048,8192 for multi-GB runs")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed median slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    current = run_suite(only, args.quick, args.warmup, args.repeat, args.seed, args.history_mb)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(current, json.load(f), args.threshold)
+        current["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['case']}: {r['baseline'] * 1e3:.3f} ms -> {r['current'] * 1e3:.3f} ms ({r['ratio']:.2f}x)")
+        if not regressions:
+            print("No regressions against baseline.")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    for path in (os.path.join(RESULTS_DIR, f"bench_{stamp}.json"), os.path.join(RESULTS_DIR, "latest.json")):
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# On-disk column layout (little-endian, fixed width so files can be memory-mapped directly)
+COLUMNS = {
+    'timestamp': '<i8',  # Seconds since epoch (UTC)
+    'water_allocated': '<f8',
+    'energy_allocated': '<f8',
+    'minerals_allocated': '<f8',
+    'efficiency_score': '<f4'
+}
+COLUMN_ALIASES = {'miners_allocated': 'minerals_allocated'}  # Header used by data/historical_allocations.csv
+RESOURCE_COLUMNS = ('water_allocated', 'energy_allocated', 'minerals_allocated')
+STORE_VERSION = 1
+
+class HistoricalStore:
+    """Columnar, memory-mapped store of historical allocations, partitioned by region and sorted by time."""
+    def __init__(self, store_dir='data/historical_store'):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        self.meta = self._load_meta()
+        self._mmaps = {}  # region -> {column: np.memmap}
+
+    def _meta_path(self):
+        return os.path.join(self.store_dir, 'meta.json')
+
+    def _load_meta(self):
+        if os.path.exists(self._meta_path()):
+            with open(self._meta_path()) as f:
+                meta = json.load(f)
+            if meta.get('version') != STORE_VERSION:
+                raise ValueError(f"Unsupported historical store version {meta.get('version')}")
+            return meta
+        return {'version': STORE_VERSION, 'columns': COLUMNS, 'regions': {}}
+
+    def _save_meta(self):
+        tmp = self._meta_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, self._meta_path())
+
+    def _column_path(self, region, column):
+        return os.path.join(self.store_dir, region, f"{column}.bin")
+
+    def _truncate_to_meta(self):
+        """Cut every column file back to the row count committed in meta.json (drops rows of failed ingests)."""
+        for entry in os.scandir(self.store_dir):
+            if not entry.is_dir():
+                continue
+            rows = self.meta['regions'].get(entry.name, {}).get('rows', 0)
+            for column, dtype in COLUMNS.items():
+                path = self._column_path(entry.name, column)
+                if os.path.exists(path) and os.path.getsize(path) != rows * np.dtype(dtype).itemsize:
+                    os.truncate(path, rows * np.dtype(dtype).itemsize)
+
+    @property
+    def regions(self):
+        return sorted(self.meta['regions'])
+
+    def __len__(self):
+        return sum(r['rows'] for r in self.meta['regions'].values())
+
+    def ingest_csv(self, csv_path, chunksize=1_000_000):
+        """Append a CSV to the store chunk by chunk; memory use is bounded by `chunksize` rows.
+
+        All or nothing: if any chunk fails, the store is rolled back to its state before the call. Regions
+        that need re-sorting are sorted into temp files and swapped in only after meta.json commits the rows.
+        """
+        start, rows = time.perf_counter(), 0
+        self._mmaps.clear()
+        self._truncate_to_meta()
+        self._finish_sorts()
+        committed = json.loads(json.dumps(self.meta))
+        try:
+            rows = self._ingest_chunks(csv_path, chunksize)
+            unsorted = [region for region, info in self.meta['regions'].items() if not info['sorted']]
+            for region in unsorted:
+                self._sort_region(region)
+        except BaseException:
+            self.meta = committed
+            self._truncate_to_meta()
+            self._discard_sorted()
+            raise
+        self._save_meta()  # Commit: new rows are durable, out-of-order regions stay flagged unsorted
+        if unsorted:
+            self._finish_sorts()
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(csv_path) / 1e6
+        return {'rows': rows, 'csv_mb': size_mb, 'seconds': elapsed, 'mb_per_sec': size_mb / elapsed if elapsed else None}
+
+    def _ingest_chunks(self, csv_path, chunksize):
+        rows = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk = chunk.rename(columns=COLUMN_ALIASES)
+            timestamps = pd.to_datetime(chunk['timestamp'], utc=True).values.astype('datetime64[s]').astype('<i8')
+            for region, idx in chunk.groupby('region', sort=False).indices.items():
+                info = self.meta['regions'].setdefault(region, {
+                    'rows': 0, 'sorted': True, 't_min': None, 't_max': None, 'sums': {c: 0.0 for c in RESOURCE_COLUMNS}})
+                os.makedirs(os.path.join(self.store_dir, region), exist_ok=True)
+                ts = timestamps[idx]
+                if info['t_max'] is not None and ts[0] < info['t_max'] or np.any(np.diff(ts) < 0):
+                    info['sorted'] = False
+                for column, dtype in COLUMNS.items():
+                    values = ts if column == 'timestamp' else chunk[column].values[idx].astype(dtype)
+                    with open(self._column_path(region, column), 'ab') as f:
+                        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                for column in RESOURCE_COLUMNS:
+                    info['sums'][column] += float(chunk[column].values[idx].sum())
+                info['rows'] += len(idx)
+                info['t_min'] = int(ts.min()) if info['t_min'] is None else min(info['t_min'], int(ts.min()))
+                info['t_max'] = int(ts.max()) if info['t_max'] is None else max(info['t_max'], int(ts.max()))
+            rows += len(chunk)
+        return rows
+
+    def _sort_region(self, region):
+        """Write a region whose input arrived out of order, in time order, to temp files (loads that region only)."""
+        order = np.argsort(np.fromfile(self._column_path(region, 'timestamp'), dtype=COLUMNS['timestamp']), kind='stable')
+        for column, dtype in COLUMNS.items():
+            path = self._column_path(region, column)
+            np.fromfile(path, dtype=dtype)[order].tofile(path + '.sorted')
+
+    def _finish_sorts(self):
+        """Swap committed sorted temp files into place (also finishes a swap interrupted by a crash)."""
+        changed = False
+        for region, info in self.meta['regions'].items():
+            if info['sorted']:
+                continue
+            for column, dtype in COLUMNS.items():
+                path = self._column_path(region, column)
+                if os.path.exists(path + '.sorted'):
+                    if os.path.getsize(path + '.sorted') == info['rows'] * np.dtype(dtype).itemsize:
+                        os.replace(path + '.sorted', path)
+                    else:
+                        os.remove(path + '.sorted')  # Left by an ingest that never committed
+            timestamps = np.fromfile(self._column_path(region, 'timestamp'), dtype=COLUMNS['timestamp'])
+            info['sorted'] = bool(np.all(np.diff(timestamps) >= 0))
+            changed = changed or info['sorted']
+        if changed:
+            self._save_meta()
+
+    def _discard_sorted(self):
+        for region in self.meta['regions']:
+            for column in COLUMNS:
+                path = self._column_path(region, column) + '.sorted'
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def columns(self, region):
+        """Read-only memory maps of every column for one region."""
+        if region not in self._mmaps:
+            rows = self.meta['regions'][region]['rows']
+            self._mmaps[region] = {c: np.memmap(self._column_path(region, c), dtype=d, mode='r', shape=(rows,))
+                                   for c, d in COLUMNS.items()}
+        return self._mmaps[region]
+
+    def column_means(self):
+        """Per-column mean of the resource columns across all regions."""
+        total = len(self) or 1
+        return {c: sum(r['sums'][c] for r in self.meta['regions'].values()) / total for c in RESOURCE_COLUMNS}
+
+    def window(self, region, start=None, end=None, columns=RESOURCE_COLUMNS):
+        """Zero-copy views of `columns` for timestamps in [start, end) (epoch seconds)."""
+        cols = self.columns(region)
+        ts = cols['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+        return {c: cols[c][lo:hi] for c in ('timestamp',) + tuple(columns)}
+
+    def take(self, region, rows, columns=RESOURCE_COLUMNS):
+        """Random access by row index within a region; returns an array of shape (len(rows), len(columns))."""
+        cols = self.columns(region)
+        rows = np.asarray(rows)
+        return np.stack([cols[c][rows] for c in columns], axis=-1)
+
+    def sample_windows(self, batch_size, length, rng=None, columns=RESOURCE_COLUMNS):
+        """Random contiguous windows of `length` rows, shape (batch_size, length, len(columns))."""
+        rng = rng if rng is not None else np.random.default_rng()
+        regions = [r for r in self.regions if self.meta['regions'][r]['rows'] >= length]
+        if not regions:
+            raise ValueError(f"No region has {length} rows of history")
+        weights = np.array([self.meta['regions'][r]['rows'] - length + 1 for r in regions], dtype=np.float64)
+        picks = rng.choice(len(regions), size=batch_size, p=weights / weights.sum())
+        batch = np.empty((batch_size, length, len(columns)), dtype=np.float64)
+        for b, pick in enumerate(picks):
+            cols = self.columns(regions[pick])
+            offset = int(rng.integers(0, int(weights[pick])))
+            for j, c in enumerate(columns):
+                batch[b, :, j] = cols[c][offset:offset + length]
+        return batch, [regions[p] for p in picks]
+
+class DemandReplay:
+    """Replays real per-region allocation trajectories as demand for PlanetaryResourceEnv."""
+    def __init__(self, store, resources=('water', 'energy', 'minerals'), scale=1.0, seed=None):
+        self.store = store
+        self.columns = tuple(f"{r}_allocated" for r in resources)
+        means = store.column_means()
+        self.norm = np.array([scale / means[c] if means.get(c) else 0.0 for c in self.columns])  # Mean demand multiplier ~= scale
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, num_regions, horizon, region_ids=None):
+        """Demand trajectory of shape (horizon, num_regions, len(resources)).
+
+        Env regions whose id is a store region replay that region; the rest replay store region i mod n.
+        """
+        regions = self.store.regions
+        if not regions:
+            raise ValueError("Historical store is empty; ingest a CSV first")
+        demand = np.empty((horizon, num_regions, len(self.columns)), dtype=np.float64)
+        for i in range(num_regions):
+            region = region_ids[i] if region_ids and region_ids[i] in self.store.meta['regions'] else regions[i % len(regions)]
+            cols = self.store.columns(region)
+            rows = len(cols['timestamp'])
+            offset = int(self.rng.integers(0, max(1, rows - horizon + 1)))
+            for j, c in enumerate(self.columns):
+                demand[:, i, j] = np.resize(cols[c][offset:offset + horizon], horizon)  # Short histories wrap around
+        return demand * self.norm
+
+# Example
+if __name__ == "__main__":
+    store = HistoricalStore('data/historical_store')
+    print("Ingest:", store.ingest_csv('data/historical_allocations.csv'))
+    print("Regions:", store.regions, "rows:", len(store))
+    print("Window:", store.window('earth_north_america'))
+    replay = DemandReplay(store, seed=2065)
+    print("Replay demand sample:", replay.sample(num_regions=3, horizon=4)[0])
@@ -3,37 +3,54 @@
 Gaia Protocol Full Stack Demo
 Runs a complete planetary simulation: quantum sync -> AI allocation -> IoT tracking -> Oracle feed -> Contract update.
 Requires Docker Compose running.
+Set GAIA_SNAPSHOT=path/to/snapshot.bin to warm-start from (and refresh) a saved simulation state.
 """
+import asyncio
+import os
 import subprocess
 import time
 import json
 from simulations.quantum_ledger import QuantumLedger
 from simulations.ai_optimizer import ResourceOptimizer
 from simulations.iot_simulator import IoTSimulator
+from simulations.snapshot import SnapshotWriter, load_snapshot
 from oracles.chainlink_bridge import ChainlinkBridge
 
+SNAPSHOT_PATH = os.environ.get("GAIA_SNAPSHOT")
+
 def run_demo():
     print("Starting Gaia Protocol Full Stack Demo...")
 
     # Step 1: Run Simulations
+    warm = load_snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH) else {}
+    if warm:
+        print(f"Warm start from {SNAPSHOT_PATH}: {', '.join(warm)}")
+
     print("1. Running Quantum Ledger Sync...")
-    ledger = QuantumLedger()
+    ledger = warm.get("ledger") or QuantumLedger()
     planetary_data = {"earth": {"water": 1000000, "energy": 500000}, "mars": {"minerals": 200000}}
     synced, consensus = ledger.multi_node_sync(planetary_data)
     print("Synced Data:", json.dumps(synced, indent=2))
 
     print("2. Optimizing with AI...")
-    optimizer = ResourceOptimizer()
-    optimizer.train(total_timesteps=1000)  # Quick train
+    optimizer = warm.get("optimizer")
+    if optimizer is None:
+        optimizer = ResourceOptimizer()
+        optimizer.train(total_timesteps=1000)  # Quick train
     regions_data = [[1000, 500, 200], [800, 400, 150]]  # Sample regions
     allocations = optimizer.optimize_allocation(regions_data)
     print("AI Allocations:", allocations)
 
     print("3. Simulating IoT Tracking...")
-    simulator = IoTSimulator(num_sensors=5)
+    simulator = warm.get("iot") or IoTSimulator(num_sensors=5)
     iot_data = asyncio.run(simulator.simulate_tracking())
     print("IoT Data Sample:", list(iot_data.keys())[:3])
 
+    writer = None
+    if SNAPSHOT_PATH:
+        writer = SnapshotWriter()  # Written in the background while the oracle steps run
+        writer.save(SNAPSHOT_PATH, simulator=simulator, ledger=ledger, optimizer=optimizer)
+
     # Step 2: Bridge to Oracles
     print("4. Feeding to Oracles...")
     bridge = ChainlinkBridge("demo_key", "0xDemoContract", "0xDemoOracle")
@@ -45,6 +62,9 @@ def run_demo():
     print("5. Updating Contracts...")
     subprocess.run(["npx", "hardhat", "run", "scripts/interact.js", "--network", "polygonMumbai"], check=True)
 
+    if writer:
+        writer.close()
+        print(f"Snapshot saved to {SNAPSHOT_PATH}")
     print("Demo Complete! Check logs for homeostasis.")
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+import bisect
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds (Prometheus-style cumulative histogram)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class StageStats:
+    """Latency histogram, call count and payload sizes for one pipeline stage."""
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.payload_sum = 0
+        self.payload_max = 0
+
+    def observe(self, latency, payload=None, error=False):
+        self.count += 1
+        self.errors += int(error)
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if payload is not None:
+            self.payload_sum += payload
+            self.payload_max = max(self.payload_max, payload)
+
+    def to_dict(self):
+        cumulative, running = {}, 0
+        for bound, n in zip(LATENCY_BUCKETS + (float('inf'),), self.buckets):
+            running += n
+            cumulative[str(bound)] = running
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'latency_sum': self.latency_sum,
+            'latency_avg': self.latency_sum / self.count if self.count else 0.0,
+            'latency_max': self.latency_max,
+            'latency_buckets': cumulative,
+            'payload_sum': self.payload_sum,
+            'payload_max': self.payload_max
+        }
+
+class SlowTickProfiler:
+    """Opt-in sampling profiler: captures stack samples only once a stage runs longer than a threshold."""
+    def __init__(self, threshold=0.5, interval=0.005, max_profiles=50):
+        self.threshold = threshold  # Seconds before a tick counts as slow
+        self.interval = interval  # Seconds between stack samples
+        self.max_profiles = max_profiles
+        self.profiles = []  # [{'stage', 'duration', 'samples': {collapsed_stack: count}}]
+        self._active = {}  # thread_id -> [stage, start, samples]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="gaia-slow-tick-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def begin(self, stage):
+        with self._lock:
+            self._active.setdefault(threading.get_ident(), [stage, time.perf_counter(), defaultdict(int)])
+
+    def end(self, stage, duration):
+        with self._lock:
+            tick = self._active.get(threading.get_ident())
+            if tick is None or tick[0] != stage:
+                return  # Nested stage: only the outermost one owns the tick
+            del self._active[threading.get_ident()]
+            if duration >= self.threshold and tick[2]:
+                self.profiles.append({'stage': stage, 'duration': duration, 'samples': dict(tick[2])})
+                del self.profiles[:-self.max_profiles]
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            with self._lock:
+                slow = {tid: tick for tid, tick in self._active.items() if now - tick[1] >= self.threshold}
+                if not slow:
+                    continue
+                frames = sys._current_frames()
+                for tid, tick in slow.items():
+                    frame = frames.get(tid)
+                    if frame is not None:
+                        stack = ';'.join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})"
+                                         for f in traceback.extract_stack(frame))
+                        tick[2][stack] += 1
+
+def _payload_size(payload, args, kwargs):
+    """Payload size for a call, or None; a failing payload callable must never break the instrumented call."""
+    if payload is None:
+        return None
+    try:
+        return payload(*args, **kwargs)
+    except Exception:
+        return None
+
+class Instrumentation:
+    """Per-stage metrics registry; every hook is a single flag check when disabled."""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = defaultdict(StageStats)
+        self.profiler = None
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+    def record(self, stage, latency, payload=None, error=False):
+        with self._lock:
+            self.stages[stage].observe(latency, payload, error)
+
+    def timed(self, stage, payload=None):
+        """Decorator recording latency/calls for sync or async functions; payload(*args, **kwargs) -> size."""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with self.stage(stage, _payload_size(payload, args, kwargs)):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage, _payload_size(payload, args, kwargs)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stage(self, name, payload=None):
+        """Context manager timing a block of code under a stage name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name, payload)
+
+    def enable_profiler(self, threshold=0.5, interval=0.005):
+        """Start capturing stack samples for stages slower than `threshold` seconds."""
+        self.profiler = SlowTickProfiler(threshold, interval)
+        self.profiler.start()
+        return self.profiler
+
+    def disable_profiler(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler = None
+
+    def snapshot(self):
+        """In-process view of all stage metrics (plus slow-tick profiles when profiling)."""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self.stages.items()}
+        snapshot = {'enabled': self.enabled, 'timestamp': time.time(), 'stages': stages}
+        if self.profiler is not None:
+            snapshot['slow_ticks'] = list(self.profiler.profiles)
+        return snapshot
+
+    def prometheus_text(self):
+        """Render the snapshot in Prometheus text exposition format."""
+        lines = [
+            "# HELP gaia_stage_latency_seconds Latency of instrumented simulation stages",
+            "# TYPE gaia_stage_latency_seconds histogram"
+        ]
+        stages = self.snapshot()['stages']
+        for name, s in sorted(stages.items()):
+            for bound, n in s['latency_buckets'].items():
+                le = '+Inf' if bound == 'inf' else bound
+                lines.append(f'gaia_stage_latency_seconds_bucket{{stage="{name}",le="{le}"}} {n}')
+            lines.append(f'gaia_stage_latency_seconds_sum{{stage="{name}"}} {s["latency_sum"]}')
+            lines.append(f'gaia_stage_latency_seconds_count{{stage="{name}"}} {s["count"]}')
+        lines += ["# HELP gaia_stage_errors_total Exceptions raised by instrumented stages",
+                  "# TYPE gaia_stage_errors_total counter"]
+        lines += [f'gaia_stage_errors_total{{stage="{name}"}} {s["errors"]}' for name, s in sorted(stages.items())]
+        lines += ["# HELP gaia_stage_payload_total Summed payload size (items) seen by each stage",
+                  "# TYPE gaia_stage_payload_total counter"]
+        lines += [f'gaia_stage_payload_total{{stage="{name}"}} {s["payload_sum"]}' for name, s in sorted(stages.items())]
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port=9108, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /snapshot (JSON) from a local daemon thread."""
+        import json
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics'):
+                    body, content_type = registry.prometheus_text().encode(), 'text/plain; version=0.0.4'
+                elif self.path.startswith('/snapshot'):
+                    body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of stderr
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="gaia-metrics-http", daemon=True).start()
+        return self._server
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+class _StageTimer:
+    __slots__ = ('registry', 'name', 'payload', 'start')
+
+    def __init__(self, registry, name, payload):
+        self.registry = registry
+        self.name = name
+        self.payload = payload
+
+    def __enter__(self):
+        if self.registry.profiler is not None:
+            self.registry.profiler.begin(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        latency = time.perf_counter() - self.start
+        self.registry.record(self.name, latency, self.payload, exc_type is not None)
+        if self.registry.profiler is not None:
+            self.registry.profiler.end(self.name, latency)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+# Process-wide registry; set GAIA_INSTRUMENTATION=1 to enable at import time
+instrumentation = Instrumentation(enabled=os.environ.get('GAIA_INSTRUMENTATION', '0') == '1')
+timed = instrumentation.timed
+stage = instrumentation.stage
+
+# Example
+if __name__ == "__main__":
+    instrumentation.enable()
+
+    @timed("example.work", payload=lambda n: n)
+    def work(n):
+        return sum(i * i for i in range(n))
+
+    for n in (1000, 10000, 100000):
+        work(n)
+    with stage("example.block"):
+        time.sleep(0.01)
+    print(instrumentation.prometheus_text())
@@ -1,32 +1,187 @@
-import logging
+import atexit
+import hashlib
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from utils.dataHelpers import DataHelpers  # Import from utils
 
+_WAKE = object()  # Queued by flush()/close(): write the partial batch now instead of waiting out flush_interval
+
 class LogAggregator:
-    def __init__(self, log_file='monitoring/gaia_logs.json'):
+    def __init__(self, log_file='monitoring/gaia_logs.json', batch_size=256, flush_interval=1.0, max_queue=10000):
         self.log_file = log_file
-        logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # Seconds before a partial batch is written
+        self.buffer = queue.Queue(maxsize=max_queue)  # Bounded: drop rather than block the sims
+        self.stats = {'enqueued': 0, 'dropped': 0, 'written': 0, 'batches': 0, 'write_errors': 0,
+                      'enqueue_latency_total': 0.0, 'enqueue_latency_max': 0.0}
+        self.last_error = None
+        self.prev_root = self._load_chain_head()  # Merkle root of the last written batch
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._writer_loop, name="gaia-log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)  # Flush-on-shutdown guarantee
+
+    def _load_chain_head(self, tail_bytes=65536):
+        """Resume the batch chain from the last batch record already in the log file."""
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(0, 2)
+                f.seek(max(0, f.tell() - tail_bytes))
+                tail = f.read().decode(errors='ignore').splitlines()
+        except FileNotFoundError:
+            return ""
+        for line in reversed(tail):
+            if '"log_batch"' in line and ' - INFO - ' in line:
+                try:
+                    record = json.loads(line.split(' - INFO - ', 1)[1])['data']
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn line from a crash mid-write
+                self.stats['batches'] = record['batch']
+                return record['merkle_root']
+        return ""
 
     def log_event(self, event_type, data):
-        """Log planetary events with Merkle integrity."""
+        """Enqueue a planetary event; the background writer hashes and persists it."""
+        start = time.perf_counter()
         log_entry = {
             'timestamp': datetime.utcnow().isoformat(),
             'event_type': event_type,
-            'data': data,
-            'merkle_hash': DataHelpers.build_merkle_tree([json.dumps(data)])
+            'data': data
+        }
+        line = json.dumps(log_entry)  # Serialize here so a bad payload fails in the caller, not the writer
+        try:
+            self.buffer.put_nowait(line)
+            accepted = True
+        except queue.Full:
+            accepted = False
+        latency = time.perf_counter() - start
+        with self._stats_lock:
+            if accepted:
+                self.stats['enqueued'] += 1
+            else:
+                self.stats['dropped'] += 1
+            self.stats['enqueue_latency_total'] += latency
+            self.stats['enqueue_latency_max'] = max(self.stats['enqueue_latency_max'], latency)
+        return accepted
+
+    def _writer_loop(self):
+        """Drain the buffer in batches, by size or by flush interval."""
+        while not self._stop.is_set() or not self.buffer.empty():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if self._stop.is_set():
+                        item = self.buffer.get_nowait()  # Shutting down: take what is there, no waiting
+                    else:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                        item = self.buffer.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _WAKE:
+                    self.buffer.task_done()
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:  # Keep the writer alive; the batch is counted as lost
+                    with self._stats_lock:
+                        self.stats['write_errors'] += len(batch)
+                    self.last_error = f"{type(e).__name__}: {e}"
+                for _ in batch:
+                    self.buffer.task_done()
+
+    def _write_batch(self, batch):
+        """Write one batch plus a record of its Merkle root chained to the previous batch."""
+        lines = list(batch)
+        batch_root = DataHelpers.build_merkle_tree(lines)
+        chained_root = hashlib.sha256((self.prev_root + batch_root).encode()).hexdigest()
+        record = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'event_type': 'log_batch',
+            'data': {'batch': self.stats['batches'] + 1, 'entries': len(lines),
+                     'batch_root': batch_root, 'prev_root': self.prev_root, 'merkle_root': chained_root}
         }
-        logging.info(json.dumps(log_entry))
-        print(f"Logged: {event_type}")
+        lines.append(json.dumps(record))
+        asctime = datetime.now().strftime('%Y-%m-%d %H:%M:%S,%f')[:-3]
+        with open(self.log_file, 'a') as f:
+            f.writelines(f"{asctime} - INFO - {line}\n" for line in lines)  # Same layout as logging.basicConfig
+        self.prev_root = chained_root
+        with self._stats_lock:
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+
+    def flush(self):
+        """Block until every enqueued entry has been written; raises if the writer is no longer running."""
+        self._wake_writer()
+        with self.buffer.all_tasks_done:
+            while self.buffer.unfinished_tasks:
+                if not self._writer.is_alive():
+                    raise RuntimeError(f"Log writer stopped with {self.buffer.unfinished_tasks} entries unwritten")
+                self.buffer.all_tasks_done.wait(0.1)
+
+    def close(self):
+        """Stop the writer after draining the buffer."""
+        if self._writer.is_alive():
+            self._stop.set()
+            self._wake_writer()
+            self._writer.join()
+
+    def _wake_writer(self):
+        try:
+            self.buffer.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # A full buffer means full batches, which are written without waiting
+
+    def get_stats(self):
+        """Counters for enqueue latency, dropped and written entries."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        attempts = stats['enqueued'] + stats['dropped']
+        stats['enqueue_latency_avg'] = stats['enqueue_latency_total'] / attempts if attempts else 0.0
+        stats['queue_depth'] = self.buffer.qsize()
+        return stats
+
+    def verify_chain(self):
+        """Recompute every batch root from the log file and check the chain."""
+        prev_root, pending = "", []
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                if ' - INFO - ' not in line:
+                    continue
+                payload = line.rstrip('\n').split(' - INFO - ', 1)[1]
+                entry = json.loads(payload)
+                if entry.get('event_type') != 'log_batch':
+                    pending.append(payload)
+                    continue
+                record = entry['data']
+                batch_root = DataHelpers.build_merkle_tree(pending)
+                expected = hashlib.sha256((prev_root + batch_root).encode()).hexdigest()
+                if record['prev_root'] != prev_root or record['merkle_root'] != expected:
+                    return False
+                prev_root, pending = expected, []
+        return not pending
 
     def aggregate_anomalies(self):
         """Aggregate anomaly logs for alerting."""
+        self.flush()  # Include events still queued for the writer
         with open(self.log_file, 'r') as f:
             logs = [json.loads(line.split(' - INFO - ')[1]) for line in f if 'anomaly' in line.lower()]
         return logs
 
 # Example
-aggregator = LogAggregator()
-aggregator.log_event('quantum_sync', {'latency': 2.5})
-aggregator.log_event('iot_anomaly', {'sensor': 'sensor_1', 'score': 0.9})
-print("Anomalies:", aggregator.aggregate_anomalies())
+if __name__ == "__main__":
+    aggregator = LogAggregator()
+    aggregator.log_event('quantum_sync', {'latency': 2.5})
+    aggregator.log_event('iot_anomaly', {'sensor': 'sensor_1', 'score': 0.9})
+    aggregator.flush()
+    print("Anomalies:", aggregator.aggregate_anomalies())
+    print("Chain valid:", aggregator.verify_chain())
+    print("Stats:", aggregator.get_stats())
@@ -7,6 +7,7 @@ from simulations.ai_optimizer import ResourceOptimizer
 from simulations.iot_simulator import IoTSimulator
 import hashlib
 import time
+from monitoring.instrumentation import timed
 
 class ChainlinkBridge:
     def __init__(self, chainlink_api_key, contract_address, oracle_address, ws_url="ws://localhost:3001"):
@@ -32,6 +33,7 @@ class ChainlinkBridge:
         self.merkle_root = self.build_merkle_tree(data_hashes)
         return {"synced": synced_ledgers, "consensus": consensus, "allocations": allocations, "merkle_root": self.merkle_root}
 
+    @timed("oracle.build_merkle_tree", payload=lambda self, hashes: len(hashes))
     def build_merkle_tree(self, hashes):
         """Build Merkle root for data integrity."""
         if not hashes:
@@ -42,6 +44,7 @@ class ChainlinkBridge:
             hashes = [hashlib.sha256((hashes[i] + hashes[i+1]).encode()).hexdigest() for i in range(0, len(hashes), 2)]
         return hashes[0]
 
+    @timed("oracle.submit_to_oracles", payload=lambda self, sim_results: len(sim_results["allocations"]))
     async def submit_to_oracles(self, sim_results):
         """Submit to multi-oracle consensus."""
         submissions = []
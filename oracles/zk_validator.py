@@ -1,5 +1,6 @@
 from py_ecc.bn128 import G1, G2, pairing, add, multiply, FQ, FQ2
 import hashlib
+import json
 
 class ZKValidator:
     def __init__(self):
@@ -28,7 +29,8 @@ class ZKValidator:
         return left == right
 
 # Example
-validator = ZKValidator()
-proof = validator.prove_data_integrity({"water": 1000}, "merkle_root_hash")
-valid = validator.verify_proof(proof, "public_input")
-print("ZK Proof Valid:", valid)
+if __name__ == "__main__":
+    validator = ZKValidator()
+    proof = validator.prove_data_integrity({"water": 1000}, hashlib.sha256(b"merkle_root").hexdigest())
+    valid = validator.verify_proof(proof, "public_input")
+    print("ZK Proof Valid:", valid)
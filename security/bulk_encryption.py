@@ -0,0 +1,152 @@
+import os
+import struct
+import time
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Envelope: one KEM exchange per session -> HKDF -> AES-256-GCM for every message/chunk in it
+SESSION_MAGIC = b"GBE1"
+SESSION_INFO = b"gaia-bulk-session-v1"
+COUNTER = struct.Struct("<Q")  # Per-message nonce counter sent on the wire
+STREAM_HEADER = struct.Struct("<QI")  # Stream number, chunk size
+CHUNK_FRAME = struct.Struct("<IB")  # Sealed length, final flag (authenticated through CHUNK_AAD)
+CHUNK_AAD = struct.Struct("<QIQB")  # Stream header, chunk index, final flag: blocks header edits, reordering and truncation
+TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 1 << 24  # Caps what an (unauthenticated) stream header can make the receiver buffer
+
+class BulkSession:
+    """Symmetric AEAD session for bulk telemetry and snapshots, keyed from a single KEM shared secret."""
+    def __init__(self, shared_secret, salt, nonce_prefix, kem_ciphertext=b"", decrypt_only=False):
+        self.salt = salt
+        self.nonce_prefix = nonce_prefix  # 4 random bytes per session + 8-byte counter = 96-bit GCM nonce
+        self.kem_ciphertext = kem_ciphertext
+        self.decrypt_only = decrypt_only  # Receivers share the sender's key and nonce prefix, so must never encrypt
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=SESSION_INFO).derive(shared_secret)
+        self._aead = AESGCM(key)
+        self._counter = 0
+        self._streams = 0
+        self.stats = {'messages': 0, 'chunks': 0, 'plaintext_bytes': 0, 'ciphertext_bytes': 0, 'seconds': 0.0}
+
+    @classmethod
+    def create(cls, shared_secret, kem_ciphertext=b""):
+        return cls(shared_secret, os.urandom(16), os.urandom(4), kem_ciphertext)
+
+    @classmethod
+    def from_header(cls, header, decapsulate):
+        """Receiver side: rebuild a decrypt-only session from its wire header with a KEM decapsulation callable."""
+        kem_ciphertext, salt, nonce_prefix = cls.parse_header(header)
+        return cls(decapsulate(kem_ciphertext), salt, nonce_prefix, kem_ciphertext, decrypt_only=True)
+
+    def header(self):
+        """Wire header the receiver needs to rebuild the session (KEM ciphertext, salt, nonce prefix)."""
+        return SESSION_MAGIC + struct.pack("<I", len(self.kem_ciphertext)) + self.kem_ciphertext + self.salt + self.nonce_prefix
+
+    @staticmethod
+    def parse_header(header):
+        if header[:4] != SESSION_MAGIC:
+            raise ValueError("Not a Gaia bulk encryption session header")
+        (kem_len,) = struct.unpack_from("<I", header, 4)
+        kem_ciphertext = header[8:8 + kem_len]
+        salt = header[8 + kem_len:24 + kem_len]
+        nonce_prefix = header[24 + kem_len:28 + kem_len]
+        return kem_ciphertext, salt, nonce_prefix
+
+    def _require_sender(self):
+        if self.decrypt_only:
+            raise RuntimeError("Receiver session is decrypt-only: encrypting would reuse the sender's nonces")
+
+    def _next_nonce(self):
+        counter = self._counter
+        self._counter += 1
+        return counter, self.nonce_prefix + COUNTER.pack(counter)
+
+    def encrypt_message(self, data, aad=b""):
+        """Encrypt one payload: 8-byte counter + ciphertext + 16-byte tag."""
+        self._require_sender()
+        start = time.perf_counter()
+        counter, nonce = self._next_nonce()
+        sealed = COUNTER.pack(counter) + self._aead.encrypt(nonce, data, aad or None)
+        self._account('messages', len(data), len(sealed), start)
+        return sealed
+
+    def decrypt_message(self, sealed, aad=b""):
+        counter = sealed[:COUNTER.size]
+        return self._aead.decrypt(self.nonce_prefix + counter, sealed[COUNTER.size:], aad or None)
+
+    def encrypt_stream(self, src, dst, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encrypt a file-like object chunk by chunk; only two chunks are ever held in memory."""
+        self._require_sender()
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes, got {chunk_size}")
+        stream_no = self._streams
+        self._streams += 1
+        dst.write(STREAM_HEADER.pack(stream_no, chunk_size))
+        index, chunk = 0, src.read(chunk_size)
+        while True:
+            following = src.read(chunk_size) if chunk else b""  # Read ahead to know which chunk is final
+            start = time.perf_counter()
+            final = not following
+            counter, nonce = self._next_nonce()
+            sealed = COUNTER.pack(counter) + self._aead.encrypt(nonce, chunk, CHUNK_AAD.pack(stream_no, chunk_size, index, final))
+            dst.write(CHUNK_FRAME.pack(len(sealed), final))
+            dst.write(sealed)
+            self._account('chunks', len(chunk), CHUNK_FRAME.size + len(sealed), start)
+            if final:
+                return index + 1
+            index, chunk = index + 1, following
+
+    def decrypt_stream(self, src, dst):
+        """Inverse of encrypt_stream; raises InvalidTag on tampering or reordering, ValueError on truncation."""
+        header = src.read(STREAM_HEADER.size)
+        if len(header) < STREAM_HEADER.size:
+            raise ValueError("Encrypted stream truncated inside its header")
+        stream_no, chunk_size = STREAM_HEADER.unpack(header)
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"Invalid chunk size {chunk_size} in stream header (limit {MAX_CHUNK_SIZE})")
+        max_sealed = COUNTER.size + chunk_size + TAG_SIZE  # Never read more than one chunk's worth
+        index = 0
+        while True:
+            frame = src.read(CHUNK_FRAME.size)
+            if len(frame) < CHUNK_FRAME.size:
+                raise ValueError("Encrypted stream truncated before its final chunk")
+            length, final = CHUNK_FRAME.unpack(frame)
+            if not COUNTER.size + TAG_SIZE <= length <= max_sealed:
+                raise ValueError(f"Invalid encrypted chunk length {length} for a stream of {chunk_size}-byte chunks")
+            sealed = src.read(length)
+            if len(sealed) < length:
+                raise ValueError("Encrypted stream truncated inside a chunk")
+            nonce = self.nonce_prefix + sealed[:COUNTER.size]
+            dst.write(self._aead.decrypt(nonce, sealed[COUNTER.size:], CHUNK_AAD.pack(stream_no, chunk_size, index, bool(final))))
+            if final:
+                return index + 1
+            index += 1
+
+    def _account(self, kind, plain, sealed, start):
+        self.stats[kind] += 1
+        self.stats['plaintext_bytes'] += plain
+        self.stats['ciphertext_bytes'] += sealed
+        self.stats['seconds'] += time.perf_counter() - start
+
+    def report(self):
+        """Throughput (MB/s of plaintext) and framing overhead per message/chunk."""
+        s = dict(self.stats)
+        units = s['messages'] + s['chunks']
+        s['throughput_mb_s'] = s['plaintext_bytes'] / 1e6 / s['seconds'] if s['seconds'] else None
+        s['overhead_per_message'] = (s['ciphertext_bytes'] - s['plaintext_bytes']) / units if units else None
+        s['session_header_bytes'] = len(self.header())
+        return s
+
+# Example
+if __name__ == "__main__":
+    import io
+    session = BulkSession.create(os.urandom(32))
+    for i in range(1000):
+        session.encrypt_message(os.urandom(512))
+    snapshot, sealed, restored = io.BytesIO(os.urandom(8 << 20)), io.BytesIO(), io.BytesIO()
+    session.encrypt_stream(snapshot, sealed)
+    sealed.seek(0)
+    session.decrypt_stream(sealed, restored)
+    print("Round trip ok:", restored.getvalue() == snapshot.getvalue())
+    print("Report:", session.report())
@@ -2,11 +2,13 @@ import os
 from cryptography.hazmat.primitives.asymmetric import kyber
 from cryptography.hazmat.primitives import serialization
 from utils.encryption import EncryptionUtils
+from security.bulk_encryption import BulkSession
 
 class KeyManager:
     def __init__(self, key_dir='security/keys/'):
         self.key_dir = key_dir
         os.makedirs(key_dir, exist_ok=True)
+        self._key_cache = {}  # key_file -> parsed key; cleared on rotation
 
     def generate_quantum_keys(self):
         """Generate Kyber keys for quantum resistance."""
@@ -24,22 +26,49 @@ class KeyManager:
                 encoding=serialization.Encoding.PEM,
                 format=serialization.PublicFormat.SubjectPublicKeyInfo
             ))
+        self._key_cache.clear()  # Never hand out a key that is no longer on disk
         print("Quantum keys generated.")
 
+    def _load_public_key(self, key_file):
+        """Parse a PEM public key once and serve it from memory afterwards."""
+        if key_file not in self._key_cache:
+            with open(os.path.join(self.key_dir, key_file), 'rb') as f:
+                self._key_cache[key_file] = serialization.load_pem_public_key(f.read())
+        return self._key_cache[key_file]
+
+    def _load_private_key(self, key_file):
+        if key_file not in self._key_cache:
+            with open(os.path.join(self.key_dir, key_file), 'rb') as f:
+                self._key_cache[key_file] = serialization.load_pem_private_key(f.read(), password=None)
+        return self._key_cache[key_file]
+
     def encrypt_sensitive_data(self, data, key_file='kyber_public.pem'):
         """Encrypt data with quantum key."""
-        with open(os.path.join(self.key_dir, key_file), 'rb') as f:
-            public_key = serialization.load_pem_public_key(f.read())
+        public_key = self._load_public_key(key_file)
         encrypted = EncryptionUtils.quantumKeyExchange(public_key)  # Simplified
         return encrypted
 
+    def open_bulk_session(self, key_file='kyber_public.pem'):
+        """One KEM exchange for a whole batch/session; payloads are then sealed with AES-GCM (see BulkSession)."""
+        exchange = EncryptionUtils.quantumKeyExchange(self._load_public_key(key_file))
+        return BulkSession.create(exchange['sharedSecret'], exchange['ciphertext'])
+
+    def accept_bulk_session(self, header, key_file='kyber_private.pem'):
+        """Receiver side of open_bulk_session: decapsulate the header's KEM ciphertext with the private key."""
+        return BulkSession.from_header(header, self._load_private_key(key_file).decapsulate)
+
     def rotate_keys(self):
         """Rotate keys periodically."""
         self.generate_quantum_keys()
         print("Keys rotated for security.")
 
 # Example
-manager = KeyManager()
-manager.generate_quantum_keys()
-encrypted = manager.encrypt_sensitive_data("planetary_secret")
-print("Data encrypted:", encrypted)
+if __name__ == "__main__":
+    manager = KeyManager()
+    manager.generate_quantum_keys()
+    encrypted = manager.encrypt_sensitive_data("planetary_secret")
+    print("Data encrypted:", encrypted)
+
+    session = manager.open_bulk_session()  # One key exchange for the whole telemetry batch
+    sealed = [session.encrypt_message(f"sensor_{i}:telemetry".encode()) for i in range(1000)]
+    print("Bulk report:", session.report())
@@ -6,58 +6,120 @@ import requests
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.callbacks import EvalCallback
-import random
 import json
 import time
+import asyncio
+from monitoring.instrumentation import timed
+from data.historical_store import DemandReplay
+from simulations.spatial_index import SENSOR_CAPACITY
+
+# Per-step rates, as a share of each region's pre-crisis capacity: in steady state supply meets mean demand
+SUPPLY_RATE = 0.1
+DEMAND_RATE = 0.1
 
 class PlanetaryResourceEnv(gym.Env):
     """Custom RL environment simulating planetary resource allocation."""
-    def __init__(self, num_regions=10, resources=['water', 'energy', 'minerals']):
+    def __init__(self, num_regions=10, resources=['water', 'energy', 'minerals'], demand_replay=None,
+                 regions=None, scenario=None, seed=None, max_steps=1000):
         super().__init__()
-        self.num_regions = num_regions
+        self.regions = regions  # Optional region records from data/planetary_regions.json
+        self.num_regions = len(regions) if regions else num_regions
+        self.region_ids = [reg['id'] for reg in regions] if regions else [f"region_{i}" for i in range(self.num_regions)]
         self.resources = resources
-        self.state = self._init_state()  # {region: {resource: amount}}
-        self.action_space = spaces.Box(low=0, high=1, shape=(num_regions * len(resources),), dtype=np.float32)  # Allocation ratios
-        self.observation_space = spaces.Box(low=0, high=1e6, shape=(num_regions * len(resources),), dtype=np.float32)
+        self.scenario = scenario  # Optional crisis scenario from data/crisis_scenarios.json
+        self.rng = np.random.default_rng(seed)
+        self.state = self._init_state()  # (regions, resources) stock levels
+        self.demand_replay = demand_replay  # Optional DemandReplay: real trajectories instead of synthetic demand
+        self.action_space = spaces.Box(low=0, high=1, shape=(self.num_regions * len(resources),), dtype=np.float32)  # Allocation ratios
+        self.observation_space = spaces.Box(low=0, high=np.inf, shape=(self.num_regions * len(resources),), dtype=np.float32)  # Fill levels
         self.steps = 0
-        self.max_steps = 1000
+        self.max_steps = max_steps
+        self.demand_scale = 1.0  # Demand multiplier, e.g. from live weather (ResourceOptimizer._augment_with_real_data)
+        self.demand = self._sample_demand()
 
     def _init_state(self):
-        return {f"region_{i}": {r: random.uniform(1000, 10000) for r in self.resources} for i in range(self.num_regions)}
+        """Draw capacities, apply the crisis scenario to supply and start every region full."""
+        if self.regions:
+            capacity = np.array([[float(reg['resources'].get(r, 0)) for r in self.resources] for reg in self.regions])
+        else:
+            capacity = self.rng.uniform(1000, 10000, (self.num_regions, len(self.resources)))
+        multipliers = np.ones_like(capacity)
+        if self.scenario:
+            mods = self.scenario.get('modifications', {})
+            for i, reg in enumerate(self.region_ids):
+                if reg in self.scenario.get('affected_regions', []):
+                    multipliers[i] = [mods.get(f"{r}_multiplier", 1.0) for r in self.resources]
+        self.capacity = capacity  # Demand stays tied to pre-crisis needs
+        self.supply = capacity * multipliers  # A crisis cuts (or boosts) what a region holds and renews
+        return self.supply.copy()
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        return [seed]
+
+    def _sample_demand(self):
+        """Per-episode demand multipliers (steps, regions, resources) replayed from history, if configured."""
+        if self.demand_replay is None:
+            return None
+        return self.demand_replay.sample(self.num_regions, self.max_steps, self.region_ids)
+
+    def set_demand_scale(self, scale):
+        self.demand_scale = scale
+
+    def _fill(self):
+        return np.divide(self.state, self.capacity, out=np.zeros_like(self.state), where=self.capacity > 0)
 
     def _get_obs(self):
-        return np.array([self.state[r][res] for r in self.state for res in self.resources])
+        return self._fill().flatten().astype(np.float32)
 
     def step(self, action):
-        # Decode action into allocations
-        allocations = action.reshape((self.num_regions, len(self.resources)))
-        total_available = {r: sum(self.state[reg][r] for reg in self.state) for r in self.resources}
-        rewards = 0
-        for i, reg in enumerate(self.state):
-            for j, res in enumerate(self.resources):
-                allocated = allocations[i][j] * total_available[res]
-                self.state[reg][res] = max(0, self.state[reg][res] + allocated - random.uniform(500, 1500))  # Simulate usage/demand
-        # Reward: Balance (minimize variance) + sustainability (penalize overuse)
-        variances = [np.var([self.state[r][res] for r in self.state]) for res in self.resources]
-        reward_balance = -sum(variances)  # Negative variance for balance
-        reward_sustain = -sum(1 for r in self.resources if total_available[r] < 5000) * 100  # Penalty for shortages
+        # Decode action into allocation shares: each resource's pooled stock is redistributed, never created
+        allocations = np.clip(np.asarray(action, dtype=np.float64).reshape((self.num_regions, len(self.resources))), 0, None)
+        totals = allocations.sum(axis=0)
+        shares = np.divide(allocations, totals, out=np.full_like(allocations, 1.0 / self.num_regions), where=totals > 0)
+        pooled = self.state.sum(axis=0)
+        if self.demand is not None:
+            multiplier = self.demand[self.steps % len(self.demand)]
+        else:
+            multiplier = self.rng.uniform(0.5, 1.5, self.state.shape)
+        demand = DEMAND_RATE * self.capacity * multiplier * self.demand_scale
+        stock = shares * pooled + SUPPLY_RATE * self.supply - demand  # Simulate renewal and usage/demand
+        shortages = int(np.sum(stock <= 0))  # Region/resource pairs that could not meet demand
+        self.state = np.maximum(stock, 0)
+        # Reward: Balance (minimize variance of fill levels) + sustainability (penalize shortages)
+        reward_balance = -float(np.var(self._fill(), axis=0).sum())
+        reward_sustain = -float(shortages)
         rewards = reward_balance + reward_sustain
         self.steps += 1
         done = self.steps >= self.max_steps
-        return self._get_obs(), rewards, done, {}
+        return self._get_obs(), rewards, done, {'shortages': shortages}
 
     def reset(self):
         self.state = self._init_state()
         self.steps = 0
+        self.demand = self._sample_demand()
         return self._get_obs()
 
 class ResourceOptimizer:
-    def __init__(self, num_regions=10, model_path="ppo_gaia.zip"):
-        self.num_regions = num_regions
-        self.env = make_vec_env(lambda: PlanetaryResourceEnv(num_regions), n_envs=4)  # Vectorized for speed
+    def __init__(self, num_regions=10, model_path="ppo_gaia.zip", history_store=None, seed=None, max_steps=1000,
+                 regions=None, sensor_capacity=SENSOR_CAPACITY):
+        self.regions = regions  # Optional region records: train on the same env ScenarioSweep evaluates
+        self.num_regions = len(regions) if regions else num_regions
+        self.max_steps = max_steps  # Episode length of the training envs
+        self.history_store = history_store  # Optional HistoricalStore for replaying real demand during training
+        self.seed_seq = np.random.SeedSequence(seed)  # Each vectorized env gets an independent child stream
+        self.rng = np.random.default_rng(self.seed_seq.spawn(1)[0])
+        self.env = make_vec_env(self._make_env, n_envs=4)  # Vectorized for speed
         self.model = PPO("MlpPolicy", self.env, verbose=1, learning_rate=0.0003, n_steps=2048)
         self.model_path = model_path
         self.fairness_threshold = 0.3  # Gini coefficient limit for equity
+        self.sensor_capacity = np.asarray(sensor_capacity, dtype=np.float64)  # Scales sensor means to env fill levels
+
+    def _make_env(self):
+        env_seed, replay_seed = self.seed_seq.spawn(2)
+        replay = DemandReplay(self.history_store, seed=replay_seed) if self.history_store is not None else None
+        return PlanetaryResourceEnv(self.num_regions, demand_replay=replay, regions=self.regions, seed=env_seed,
+                                    max_steps=self.max_steps)
 
     def train(self, total_timesteps=10000, real_data_augmentation=True):
         """Train RL model with optional real data."""
@@ -74,27 +136,36 @@ class ResourceOptimizer:
             response = requests.get("https://api.openweathermap.org/data/2.5/weather?q=London&appid=your_api_key")
             data = response.json()
             temp = data['main']['temp']  # Simulate demand based on temp
-            # Adjust env dynamics (simplified)
-            self.env.env_fns[0]().state['region_0']['water'] *= (1 + (temp - 273) / 100)  # Higher temp = more demand
+            # Higher temp = more demand, applied to every training env
+            self.env.env_method('set_demand_scale', 1 + (temp - 273) / 100)
         except:
             print("Real data fetch failed; using synthetic.")
 
+    def _to_observation(self, regions_data):
+        """Per-region sensor means -> the env's observation: flattened float32 fill levels."""
+        readings = np.asarray(regions_data, dtype=np.float64).reshape((self.num_regions, len(self.sensor_capacity)))
+        return (np.clip(readings, 0, None) / self.sensor_capacity).flatten().astype(np.float32)
+
+    @timed("ai.optimize_allocation", payload=lambda self, regions_data: len(regions_data))
     def optimize_allocation(self, regions_data):
         """Predict allocations using trained model."""
-        obs = np.array([d for sublist in regions_data for d in sublist])  # Flatten
+        obs = self._to_observation(regions_data)  # The policy was trained on fill levels, not raw readings
         action, _ = self.model.predict(obs, deterministic=True)
-        allocations = action.reshape((self.num_regions, len(PlanetaryResourceEnv().resources)))
+        allocations = action.reshape((self.num_regions, len(self.sensor_capacity)))
         # Apply fairness: Adjust for Gini
         gini = self._calculate_gini(allocations.flatten())
         if gini > self.fairness_threshold:
             allocations = self._redistribute_for_fairness(allocations)
         return allocations.tolist()
 
-    def _calculate_gini(self, array):
+    @staticmethod
+    def _calculate_gini(array):
         """Calculate Gini coefficient for fairness."""
         array = np.sort(array)
         n = len(array)
         cumsum = np.cumsum(array)
+        if cumsum[-1] == 0:
+            return 0.0  # Nothing allocated: perfectly (if trivially) equal
         return (n + 1 - 2 * np.sum(cumsum) / cumsum[-1]) / n
 
     def _redistribute_for_fairness(self, allocations):
@@ -117,22 +188,25 @@ class ResourceOptimizer:
 
     def integrate_with_quantum_iot(self, quantum_ledger, iot_simulator):
         """Full integration: Sync with quantum ledger and IoT for planetary optimization."""
-        iot_data = iot_simulator.simulate_tracking()
-        regions_data = [[d['water_level'], d['energy_usage'], random.uniform(0, 1000)] for d in iot_data.values()]
+        iot_data = asyncio.run(iot_simulator.simulate_tracking())
+        index = iot_simulator.get_region_index()
+        if len(index.region_ids) != self.num_regions:
+            raise ValueError(f"Optimizer expects {self.num_regions} regions, {iot_simulator.regions_file} defines {len(index.region_ids)}")
+        regions_data = index.aggregate_sensors(iot_data).tolist()  # Per-region means, one row per planetary region
         allocations = self.optimize_allocation(regions_data)
         # Simulate planetary data
-        planetary_data = {f"region_{i}": {"water": allocations[i][0], "energy": allocations[i][1], "minerals": allocations[i][2]} for i in range(len(allocations))}
+        planetary_data = {region: {"water": allocations[i][0], "energy": allocations[i][1], "minerals": allocations[i][2]} for i, region in enumerate(index.region_ids)}
         synced_ledgers, consensus = quantum_ledger.multi_node_sync(planetary_data)
         return synced_ledgers, consensus, allocations
 
 # Example Usage (Runnable Standalone)
 if __name__ == "__main__":
-    from quantum_ledger import QuantumLedger  # Import from same folder
-    from iot_simulator import IoTSimulator
+    from simulations.quantum_ledger import QuantumLedger
+    from simulations.iot_simulator import IoTSimulator
     
-    optimizer = ResourceOptimizer()
     ledger = QuantumLedger()
     simulator = IoTSimulator()
+    optimizer = ResourceOptimizer(num_regions=len(simulator.get_region_index().region_ids))  # One input row per planetary region
     
     # Train model (short for demo; run longer for better results)
     optimizer.train(total_timesteps=5000)
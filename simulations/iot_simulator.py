@@ -1,4 +1,3 @@
-import random
 import time
 import asyncio
 import json
@@ -7,19 +6,22 @@ from scipy.integrate import odeint
 import requests
 from collections import defaultdict
 import threading
+from monitoring.instrumentation import timed
+from simulations.spatial_index import DEFAULT_BODY, RegionIndex
 
 class DigitalTwin:
     """Physics-based digital twin for resources (e.g., water flow, energy dissipation)."""
-    def __init__(self, resource_type, initial_state):
+    def __init__(self, resource_type, initial_state, rng=None):
         self.type = resource_type
         self.state = initial_state  # e.g., {'level': 1000, 'flow_rate': 10}
+        self.rng = rng if rng is not None else np.random.default_rng()
 
     def simulate_physics(self, dt=1):
         """ODE-based simulation for resource dynamics."""
         def model(y, t):
             level, flow = y
-            dlevel_dt = flow - random.uniform(0.5, 1.5)  # Usage/demand
-            dflow_dt = -0.1 * flow + random.uniform(-0.1, 0.1)  # Damping + noise
+            dlevel_dt = flow - self.rng.uniform(0.5, 1.5)  # Usage/demand
+            dflow_dt = -0.1 * flow + self.rng.uniform(-0.1, 0.1)  # Damping + noise
             return [dlevel_dt, dflow_dt]
         
         t = np.linspace(0, dt, 10)
@@ -28,12 +30,15 @@ class DigitalTwin:
         return self.state
 
 class IoTSimulator:
-    def __init__(self, num_sensors=100, planetary_scale=True):
+    def __init__(self, num_sensors=100, planetary_scale=True, seed=None, regions_file='data/planetary_regions.json'):
         self.num_sensors = num_sensors
+        self.rng = np.random.default_rng(seed)  # Per-simulator stream: reproducible and safe across processes
+        rng = self.rng
         self.sensors = {f"sensor_{i}": {
-            'location': (random.uniform(-90, 90), random.uniform(-180, 180)),  # Lat/Long
-            'data': {'water_level': random.uniform(0, 1000), 'energy_usage': random.uniform(0, 500), 'minerals_stock': random.uniform(0, 10000)},
-            'twin': DigitalTwin('water', {'level': random.uniform(500, 1500), 'flow_rate': random.uniform(5, 15)}),
+            'location': (rng.uniform(-90, 90), rng.uniform(-180, 180)),  # Lat/Long
+            'body': DEFAULT_BODY,  # Celestial body the coordinates refer to
+            'data': {'water_level': rng.uniform(0, 1000), 'energy_usage': rng.uniform(0, 500), 'minerals_stock': rng.uniform(0, 10000)},
+            'twin': DigitalTwin('water', {'level': rng.uniform(500, 1500), 'flow_rate': rng.uniform(5, 15)}, rng),
             'anomaly_score': 0,
             'network_status': 'active'
         } for i in range(num_sensors)}
@@ -41,20 +46,23 @@ class IoTSimulator:
         self.anomaly_detector = self._init_anomaly_detector()
         self.consensus_log = []
         self.planetary_scale = planetary_scale  # Enable global augmentations
+        self.regions_file = regions_file
+        self.region_index = None  # Built on first use, then kept up to date by add_sensor/move_sensor
 
     def _init_anomaly_detector(self):
         """Simple ML-based anomaly detection (threshold-based for demo)."""
         return {'water_threshold': 200, 'energy_threshold': 400}  # Tune with real data
 
+    @timed("iot.simulate_tracking", payload=lambda self: len(self.sensors))
     async def simulate_tracking(self):
         """Real-time tracking with streaming."""
         for sensor_id, sensor in self.sensors.items():
             # Update digital twin
             sensor['twin'].simulate_physics()
             # Simulate sensor readings with noise
-            sensor['data']['water_level'] = max(0, sensor['twin'].state['level'] + random.gauss(0, 50))
-            sensor['data']['energy_usage'] += random.gauss(0, 20)
-            sensor['data']['minerals_stock'] -= random.uniform(0, 10)
+            sensor['data']['water_level'] = max(0, sensor['twin'].state['level'] + self.rng.normal(0, 50))
+            sensor['data']['energy_usage'] += self.rng.normal(0, 20)
+            sensor['data']['minerals_stock'] -= self.rng.uniform(0, 10)
             # Anomaly detection
             sensor['anomaly_score'] = self._detect_anomaly(sensor['data'])
             if sensor['anomaly_score'] > 0.8:
@@ -87,7 +95,7 @@ class IoTSimulator:
                 if response.status_code == 200:
                     # Simulate adjusting sensors based on real imagery
                     for sensor in self.sensors.values():
-                        sensor['data']['water_level'] *= random.uniform(0.9, 1.1)  # Adjust based on "real" data
+                        sensor['data']['water_level'] *= self.rng.uniform(0.9, 1.1)  # Adjust based on "real" data
             except:
                 print("Real data augmentation failed; using synthetic.")
 
@@ -95,13 +103,44 @@ class IoTSimulator:
         """Simulate mesh network consensus for data validation."""
         votes = defaultdict(list)
         for sensor_id, sensor in self.sensors.items():
-            for neighbor in random.sample(list(self.sensors.keys()), 3):  # Random neighbors
+            for neighbor in self.rng.choice(list(self.sensors.keys()), 3, replace=False):  # Random neighbors
                 votes[sensor_id].append(self.sensors[neighbor]['data']['water_level'])
         for sensor_id in votes:
             consensus_value = np.median(votes[sensor_id])
             self.sensors[sensor_id]['data']['water_level'] = (self.sensors[sensor_id]['data']['water_level'] + consensus_value) / 2
         self.consensus_log.append({"round": len(self.consensus_log) + 1, "consensus": dict(votes), "timestamp": time.time()})
 
+    def get_region_index(self):
+        """Spatial index assigning every sensor to its nearest planetary region."""
+        if self.region_index is None:
+            self.region_index = RegionIndex.from_regions_file(self.regions_file)
+        if len(self.region_index) != len(self.sensors):
+            self.region_index.sync(self.sensors)
+        return self.region_index
+
+    def add_sensor(self, sensor_id, location, body=DEFAULT_BODY):
+        """Deploy a new sensor on `body`; the region index is updated incrementally."""
+        self.sensors[sensor_id] = {
+            'location': tuple(location),
+            'body': body,
+            'data': {'water_level': self.rng.uniform(0, 1000), 'energy_usage': self.rng.uniform(0, 500), 'minerals_stock': self.rng.uniform(0, 10000)},
+            'twin': DigitalTwin('water', {'level': self.rng.uniform(500, 1500), 'flow_rate': self.rng.uniform(5, 15)}, self.rng),
+            'anomaly_score': 0,
+            'network_status': 'active'
+        }
+        self.num_sensors = len(self.sensors)
+        if self.region_index is not None:
+            self.region_index.upsert(sensor_id, self.sensors[sensor_id]['location'], body)
+
+    def move_sensor(self, sensor_id, location):
+        """Relocate a sensor (e.g., a drifting buoy); only that sensor is re-indexed."""
+        self.sensors[sensor_id]['location'] = tuple(location)
+        if self.region_index is not None:
+            self.region_index.upsert(sensor_id, self.sensors[sensor_id]['location'], self.sensors[sensor_id].get('body', DEFAULT_BODY))
+
+    def sensors_near(self, lat, lon, radius_km):
+        return self.get_region_index().query_radius(lat, lon, radius_km)
+
     def get_digital_twin(self, sensor_id):
         """Retrieve full digital twin data."""
         return self.sensors.get(sensor_id, {}).get('twin', {}).state
@@ -109,20 +148,23 @@ class IoTSimulator:
     def integrate_with_quantum_ai(self, quantum_ledger, ai_optimizer):
         """Full integration: Feed IoT data to quantum sync and AI optimization."""
         iot_data = asyncio.run(self.simulate_tracking())
-        regions_data = [[d['data']['water_level'], d['data']['energy_usage'], d['data']['minerals_stock']] for d in iot_data.values()]
+        index = self.get_region_index()
+        if len(index.region_ids) != ai_optimizer.num_regions:
+            raise ValueError(f"Optimizer expects {ai_optimizer.num_regions} regions, {self.regions_file} defines {len(index.region_ids)}")
+        regions_data = index.aggregate_sensors(iot_data).tolist()  # Per-region means, one row per planetary region
         allocations = ai_optimizer.optimize_allocation(regions_data)
-        planetary_data = {f"region_{i}": {"water": allocations[i][0], "energy": allocations[i][1], "minerals": allocations[i][2]} for i in range(len(allocations))}
+        planetary_data = {region: {"water": allocations[i][0], "energy": allocations[i][1], "minerals": allocations[i][2]} for i, region in enumerate(index.region_ids)}
         synced_ledgers, consensus = quantum_ledger.multi_node_sync(planetary_data)
         return synced_ledgers, consensus, iot_data
 
 # Example Usage (Runnable Standalone)
 async def main():
-    from quantum_ledger import QuantumLedger
-    from ai_optimizer import ResourceOptimizer
+    from simulations.quantum_ledger import QuantumLedger
+    from simulations.ai_optimizer import ResourceOptimizer
     
     simulator = IoTSimulator(num_sensors=10)  # Scale up for planetary
     ledger = QuantumLedger()
-    optimizer = ResourceOptimizer()
+    optimizer = ResourceOptimizer(num_regions=len(simulator.get_region_index().region_ids))  # One input row per planetary region
     
     # Augment with real data
     simulator.augment_with_real_data()
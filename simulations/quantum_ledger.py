@@ -5,18 +5,51 @@ from qiskit.providers.aer import AerSimulator
 from qiskit.quantum_info import Statevector, random_statevector
 from qiskit.circuit.library import QFT, IQFT
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait
 import time
 import json
+import threading
+from monitoring.instrumentation import timed
+
+def default_shard_key(node_id):
+    """Shard by planet/continent prefix: 'earth_africa' -> 'earth', 'mars_colony' -> 'mars'."""
+    return node_id.split('_', 1)[0]
+
+def _weighted_median(values, weights):
+    order = np.argsort(values)
+    values, cumulative = np.asarray(values)[order], np.cumsum(np.asarray(weights)[order])
+    return values[np.searchsorted(cumulative, cumulative[-1] / 2)]
+
+# Shard worker state: one ledger (and simulator backend) per worker process, reused across rounds
+_shard_ledger = None
+
+def _init_shard_worker(num_qubits):
+    global _shard_ledger
+    _shard_ledger = QuantumLedger(num_qubits=num_qubits)
+
+def _shard_round(shard_id, shard_data, seed):
+    """Local consensus and Merkle root for one shard, run inside a worker process."""
+    _shard_ledger.rng = np.random.default_rng(seed)
+    synced, votes = _shard_ledger._local_consensus(shard_data)
+    root = _shard_ledger.build_merkle_tree([_shard_ledger.quantum_hash(json.dumps(d)) for d in synced.values()])
+    return {"shard": shard_id, "ledgers": synced, "summary": votes, "merkle_root": root, "nodes": len(synced)}
 
 class QuantumLedger:
-    def __init__(self, num_qubits=9, nodes=5):  # 9 qubits for Shor error correction
+    def __init__(self, num_qubits=9, nodes=5, seed=None, shard_workers=None, shard_deadline=None):  # 9 qubits for Shor error correction
         self.num_qubits = num_qubits
         self.nodes = nodes  # Simulate planetary nodes (e.g., continents)
+        self.rng = np.random.default_rng(seed)
         self.backend = AerSimulator()  # Noisy simulator for realism
         self.ledger = defaultdict(dict)  # Distributed ledger: node -> {resource: amount}
         self.merkle_tree = {}  # Classical Merkle tree for hashing
         self.consensus_log = []  # Log of consensus rounds
+        self.shard_workers = shard_workers  # Worker processes for hierarchical rounds (None: one per core)
+        self.shard_deadline = shard_deadline  # Seconds to wait for shards before using their previous summary
+        self.shard_state = {}  # shard -> latest completed shard round (summary, root, ledgers), late ones included
+        self._shard_lock = threading.Lock()  # Late shard results land from the pool's callback thread
+        self._shard_pool = None
 
+    @timed("quantum.quantum_hash", payload=lambda self, data: len(data))
     def quantum_hash(self, data):
         """Quantum hashing using QFT for secure, entanglement-based hash."""
         qc = QuantumCircuit(self.num_qubits // 3, self.num_qubits // 3)  # Simplified
@@ -34,15 +67,20 @@ class QuantumLedger:
         result = job.result().get_counts()
         return list(result.keys())[0]  # Quantum hash as string
 
+    @timed("quantum.build_merkle_tree", payload=lambda self, data_list: len(data_list))
     def build_merkle_tree(self, data_list):
         """Classical Merkle tree for data integrity."""
         if not data_list:
             return None
+        return self._merkle_subtree(data_list)
+
+    def _merkle_subtree(self, data_list):
+        """Recursive half-split Merkle root (kept out of the instrumented entry point)."""
         if len(data_list) == 1:
             return hashlib.sha256(data_list[0].encode()).hexdigest()
         mid = len(data_list) // 2
-        left = self.build_merkle_tree(data_list[:mid])
-        right = self.build_merkle_tree(data_list[mid:])
+        left = self._merkle_subtree(data_list[:mid])
+        right = self._merkle_subtree(data_list[mid:])
         return hashlib.sha256((left + right).encode()).hexdigest()
 
     def apply_error_correction(self, qc):
@@ -86,11 +124,11 @@ class QuantumLedger:
         counts = result.get_counts()
         # Decode synced data (approximate FTL sync)
         synced_amount = sum(int(k, 2) for k in counts.keys()) / 1024 * max(global_data.values())
-        self.ledger[node_id] = {k: v * np.random.uniform(0.95, 1.05) for k, v in global_data.items()}  # Self-correct oscillation
+        self.ledger[node_id] = {k: v * self.rng.uniform(0.95, 1.05) for k, v in global_data.items()}  # Self-correct oscillation
         return self.ledger[node_id]
 
-    def multi_node_sync(self, nodes_data):
-        """Distributed sync across planetary nodes with consensus."""
+    def _local_consensus(self, nodes_data):
+        """Sync every node, then take the per-resource median across them."""
         synced_ledgers = {}
         for node, data in nodes_data.items():
             synced_ledgers[node] = self.sync_inventory(data, node)
@@ -99,12 +137,96 @@ class QuantumLedger:
         for resource in set(k for d in nodes_data.values() for k in d.keys()):
             votes = [synced_ledgers[node].get(resource, 0) for node in synced_ledgers]
             consensus_votes[resource] = np.median(votes)  # Median for fault tolerance
+        return synced_ledgers, consensus_votes
+
+    @timed("quantum.multi_node_sync", payload=lambda self, nodes_data, *args, **kwargs: len(nodes_data))
+    def multi_node_sync(self, nodes_data, hierarchical=False, shard_key=default_shard_key, deadline=None):
+        """Distributed sync across planetary nodes with consensus."""
+        if hierarchical:
+            return self.hierarchical_sync(nodes_data, shard_key, deadline)
+        synced_ledgers, consensus_votes = self._local_consensus(nodes_data)
         self.consensus_log.append({"round": len(self.consensus_log) + 1, "votes": consensus_votes, "timestamp": time.time()})
         # Update Merkle tree
         data_hashes = [self.quantum_hash(json.dumps(d)) for d in synced_ledgers.values()]
         self.merkle_tree = self.build_merkle_tree(data_hashes)
         return synced_ledgers, consensus_votes
 
+    def _get_shard_pool(self):
+        if self._shard_pool is None:
+            self._shard_pool = ProcessPoolExecutor(max_workers=self.shard_workers, initializer=_init_shard_worker,
+                                                   initargs=(self.num_qubits,))
+        return self._shard_pool
+
+    def _store_shard_result(self, round_no, future):
+        """Keep the newest completed round per shard, even if it finished after its deadline."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        with self._shard_lock:
+            previous = self.shard_state.get(result["shard"])
+            if previous is None or previous["round"] <= round_no:
+                self.shard_state[result["shard"]] = dict(result, round=round_no)
+                self.ledger.update(result["ledgers"])
+
+    def hierarchical_sync(self, nodes_data, shard_key=default_shard_key, deadline=None):
+        """Two-level consensus: shards agree locally in parallel, the top level combines only shard summaries."""
+        deadline = self.shard_deadline if deadline is None else deadline
+        shards = defaultdict(dict)
+        for node, data in nodes_data.items():
+            shards[shard_key(node)][node] = data
+        pool = self._get_shard_pool()
+        seeds = self.rng.integers(2 ** 63, size=len(shards))  # Independent, reproducible stream per shard
+        round_no = len(self.consensus_log) + 1
+        futures = {pool.submit(_shard_round, shard, shards[shard], int(seed)): shard
+                   for shard, seed in zip(sorted(shards), seeds)}
+        for future in futures:
+            future.add_done_callback(lambda f: self._store_shard_result(round_no, f))  # Late results feed the fallback
+        done, pending = wait(futures, timeout=deadline)
+        rounds, status = {}, {}
+        for future in done:
+            self._store_shard_result(round_no, future)  # Callbacks may not have run yet when wait() returns
+            result = future.result()
+            rounds[result["shard"]], status[result["shard"]] = result, "fresh"
+        stragglers = sorted(futures[f] for f in pending)
+        with self._shard_lock:
+            for shard in stragglers:
+                if shard in self.shard_state:
+                    rounds[shard], status[shard] = self.shard_state[shard], "stale"  # Fall back to the latest round
+                else:
+                    status[shard] = "missing"  # No summary yet: left out of this round, logged below
+        # Top level: weighted median of shard medians, Merkle tree over shard roots only
+        consensus_votes = {}
+        for resource in set(k for r in rounds.values() for k in r["summary"]):
+            summaries = [r for r in rounds.values() if resource in r["summary"]]
+            consensus_votes[resource] = _weighted_median([r["summary"][resource] for r in summaries],
+                                                         [r["nodes"] for r in summaries])
+        if rounds:
+            self.merkle_tree = self.build_merkle_tree([rounds[shard]["merkle_root"] for shard in sorted(rounds)])
+        nodes_by_status = defaultdict(int)
+        for shard, members in shards.items():
+            nodes_by_status[status[shard]] += len(members)
+        self.consensus_log.append({
+            "round": len(self.consensus_log) + 1,
+            "votes": consensus_votes,
+            "timestamp": time.time(),
+            "shards": {shard: {"nodes": len(shards[shard]), "status": status[shard],
+                               "merkle_root": rounds[shard]["merkle_root"] if shard in rounds else None}
+                       for shard in sorted(shards)},
+            "stragglers": stragglers,
+            "quorum": nodes_by_status["fresh"] / max(1, len(nodes_data)),  # Share of nodes agreeing this round
+            "stale": nodes_by_status["stale"] / max(1, len(nodes_data))  # Share of nodes represented by an earlier round's summary
+        })
+        if not rounds:  # Logged so late results cannot reuse this round number; the previous root stays in place
+            raise RuntimeError(f"No shard finished within {deadline}s and none has an earlier summary to fall back on")
+        synced_ledgers = {node: ledger for r in rounds.values() for node, ledger in r["ledgers"].items()}
+        return synced_ledgers, consensus_votes
+
+    def close(self):
+        """Shut down the shard worker pool."""
+        if self._shard_pool is not None:
+            self._shard_pool.shutdown(cancel_futures=True)
+            self._shard_pool = None
+
     def validate_ledger(self, node_id):
         """Validate a node's ledger against Merkle root."""
         node_hash = self.quantum_hash(json.dumps(self.ledger[node_id]))
@@ -113,7 +235,7 @@ class QuantumLedger:
     def integrate_with_ai_iot(self, ai_optimizer, iot_simulator):
         """Real-time integration: Pull from AI and IoT for dynamic sync."""
         iot_data = iot_simulator.simulate_tracking()
-        regions = [[d['water_level'], d['energy_usage'], random.uniform(0,1)] for d in iot_data.values()]
+        regions = [[d['water_level'], d['energy_usage'], self.rng.uniform(0, 1)] for d in iot_data.values()]
         allocations = ai_optimizer.optimize_allocation(regions)
         # Simulate planetary data from IoT
         planetary_data = {f"region_{i}": {"water": allocations[i], "energy": iot_data[f"sensor_{i}"]['energy_usage']} for i in range(len(allocations))}
@@ -122,8 +244,8 @@ class QuantumLedger:
 
 # Example Usage (Runnable Standalone)
 if __name__ == "__main__":
-    from ai_optimizer import ResourceOptimizer  # Import from same folder
-    from iot_simulator import IoTSimulator
+    from simulations.ai_optimizer import ResourceOptimizer
+    from simulations.iot_simulator import IoTSimulator
     
     ledger = QuantumLedger()
     optimizer = ResourceOptimizer()
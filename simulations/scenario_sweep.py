@@ -0,0 +1,134 @@
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from simulations.ai_optimizer import PlanetaryResourceEnv, ResourceOptimizer
+
+BASELINE_SCENARIO = {"name": "Baseline", "affected_regions": [], "modifications": {}}
+
+def load_regions(path='data/planetary_regions.json'):
+    with open(path) as f:
+        return json.load(f)["regions"]
+
+def load_scenarios(path='data/crisis_scenarios.json'):
+    with open(path) as f:
+        return json.load(f)["scenarios"]
+
+class RunningStats:
+    """Streaming mean/variance/min/max (Welford), so results never have to be held in memory."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def to_dict(self):
+        std = math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {"count": self.count, "mean": self.mean, "std": std,
+                "ci95": 1.96 * std / math.sqrt(self.count) if self.count else 0.0,
+                "min": self.min if self.count else None, "max": self.max if self.count else None}
+
+# Worker-process state: the policy is loaded once per process, not once per rollout
+_worker_policy = None
+
+def _init_worker(model_path):
+    global _worker_policy
+    try:
+        import torch
+        torch.set_num_threads(1)  # One core per worker; the pool provides the parallelism
+    except ImportError:
+        pass
+    if model_path:
+        from stable_baselines3 import PPO
+        _worker_policy = PPO.load(model_path, device="cpu")
+
+def _run_rollouts(regions, scenario, seed_seqs, max_steps):
+    """Run one rollout per SeedSequence and return per-rollout reward, Gini and shortage figures."""
+    results = []
+    for seed_seq in seed_seqs:
+        env = PlanetaryResourceEnv(regions=regions, scenario=scenario, seed=seed_seq, max_steps=max_steps)
+        obs = env.reset()
+        if _worker_policy is not None and _worker_policy.observation_space.shape != obs.shape:
+            raise ValueError(f"Policy expects observations of shape {_worker_policy.observation_space.shape}, "
+                             f"env produces {obs.shape}; train ResourceOptimizer(regions=load_regions())")
+        proportional = (env.capacity / env.capacity.sum(axis=0)).flatten().astype(np.float32)  # Share by capacity
+        total_reward, shortage_steps, done = 0.0, 0, False
+        while not done:
+            action = _worker_policy.predict(obs, deterministic=True)[0] if _worker_policy is not None else proportional
+            obs, reward, done, info = env.step(action)
+            total_reward += reward
+            shortage_steps += info['shortages'] > 0
+        results.append({
+            "reward": float(total_reward),
+            "gini": float(ResourceOptimizer._calculate_gini(obs.flatten())),
+            "shortage": shortage_steps / env.steps  # Fraction of steps with at least one depleted resource
+        })
+    return results
+
+class ScenarioSweep:
+    """Monte Carlo sweep of crisis scenarios through the trained allocation policy on a process pool."""
+    def __init__(self, model_path="ppo_gaia.zip", regions_file='data/planetary_regions.json',
+                 scenarios_file='data/crisis_scenarios.json', seeds_per_scenario=1000, max_steps=200,
+                 workers=None, chunk_size=25, base_seed=2065, include_baseline=True):
+        self.model_path = model_path  # None: capacity-proportional allocation instead of a trained policy
+        self.regions = load_regions(regions_file)
+        self.scenarios = ([BASELINE_SCENARIO] if include_baseline else []) + load_scenarios(scenarios_file)
+        self.seeds_per_scenario = seeds_per_scenario
+        self.max_steps = max_steps
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size  # Rollouts per task: amortizes IPC without hurting load balance
+        self.base_seed = base_seed
+
+    def _tasks(self):
+        """Independent, reproducible RNG streams: results do not depend on worker count or scheduling."""
+        root = np.random.SeedSequence(self.base_seed)
+        for scenario, scenario_seq in zip(self.scenarios, root.spawn(len(self.scenarios))):
+            seeds = scenario_seq.spawn(self.seeds_per_scenario)
+            for i in range(0, len(seeds), self.chunk_size):
+                yield scenario, seeds[i:i + self.chunk_size]
+
+    def run(self, on_progress=None):
+        """Run every scenario and stream rollouts into per-scenario aggregates."""
+        start = time.perf_counter()
+        stats = {s["name"]: {"reward": RunningStats(), "gini": RunningStats(), "shortage": RunningStats()}
+                 for s in self.scenarios}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.model_path,)) as pool:
+            futures = {pool.submit(_run_rollouts, self.regions, scenario, seeds, self.max_steps): scenario["name"]
+                       for scenario, seeds in self._tasks()}
+            done = 0
+            for future in as_completed(futures):
+                name = futures[future]
+                for rollout in future.result():
+                    for metric, value in rollout.items():
+                        stats[name][metric].add(value)
+                done += 1
+                if on_progress:
+                    on_progress(done, len(futures))
+        elapsed = time.perf_counter() - start
+        rollouts = self.seeds_per_scenario * len(self.scenarios)
+        return {
+            "scenarios": {name: {metric: s.to_dict() for metric, s in metrics.items()} for name, metrics in stats.items()},
+            "rollouts": rollouts,
+            "seconds": elapsed,
+            "rollouts_per_sec": rollouts / elapsed if elapsed else None
+        }
+
+# Example Usage (Runnable Standalone)
+if __name__ == "__main__":
+    model_path = "ppo_gaia.zip" if os.path.exists("ppo_gaia.zip") else None  # Train with ResourceOptimizer(regions=load_regions()) first
+    sweep = ScenarioSweep(model_path=model_path, seeds_per_scenario=200, max_steps=100)
+    summary = sweep.run(on_progress=lambda done, total: print(f"\r{done}/{total} tasks", end=""))
+    print()
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,266 @@
+import json
+import os
+import struct
+import threading
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from simulations.spatial_index import DEFAULT_BODY, SENSOR_CAPACITY
+
+# Bundle layout: fixed preamble | JSON header | 64-byte aligned raw arrays (memory-mappable in place)
+MAGIC = b"GAIASNAP"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sHHI")  # magic, format version, reserved, header length
+ALIGN = 64
+STATUS_CODES = ['active', 'alert']
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+# Capture: cheap copies taken on the caller's thread, so the simulation can keep running while we write
+
+def capture_iot(simulator):
+    ids = list(simulator.sensors)
+    sensors = [simulator.sensors[i] for i in ids]
+    statuses = sorted(set(STATUS_CODES) | {s['network_status'] for s in sensors})
+    twin_types = sorted({s['twin'].type for s in sensors})
+    bodies = sorted({s.get('body', DEFAULT_BODY) for s in sensors} | {DEFAULT_BODY})
+    arrays = {
+        'iot/location': np.array([s['location'] for s in sensors], dtype=np.float64).reshape(-1, 2),
+        'iot/data': np.array([[s['data']['water_level'], s['data']['energy_usage'], s['data']['minerals_stock']]
+                              for s in sensors], dtype=np.float64).reshape(-1, 3),
+        'iot/twin': np.array([[s['twin'].state['level'], s['twin'].state['flow_rate']] for s in sensors],
+                             dtype=np.float64).reshape(-1, 2),
+        'iot/anomaly': np.array([s['anomaly_score'] for s in sensors], dtype=np.float64),
+        'iot/status': np.array([statuses.index(s['network_status']) for s in sensors], dtype=np.uint8),
+        'iot/twin_type': np.array([twin_types.index(s['twin'].type) for s in sensors], dtype=np.uint8),
+        'iot/body': np.array([bodies.index(s.get('body', DEFAULT_BODY)) for s in sensors], dtype=np.uint8)
+    }
+    meta = {
+        'sensor_ids': ids,
+        'statuses': statuses,
+        'twin_types': twin_types,
+        'bodies': bodies,
+        'planetary_scale': simulator.planetary_scale,
+        'regions_file': simulator.regions_file,
+        'anomaly_detector': dict(simulator.anomaly_detector),
+        'consensus_log': list(simulator.consensus_log),
+        'rng_state': simulator.rng.bit_generator.state  # Twins share the simulator's stream
+    }
+    return meta, arrays
+
+def capture_ledger(ledger):
+    meta = {
+        'num_qubits': ledger.num_qubits,
+        'nodes': ledger.nodes,
+        'ledger': {node: {k: float(v) for k, v in data.items()} for node, data in ledger.ledger.items()},
+        'merkle_tree': ledger.merkle_tree,
+        'consensus_log': list(ledger.consensus_log),
+        'rng_state': ledger.rng.bit_generator.state,
+        'shard_workers': ledger.shard_workers,
+        'shard_deadline': ledger.shard_deadline,
+        'shard_state': {shard: dict(state, summary={k: float(v) for k, v in state['summary'].items()},
+                                    ledgers={node: {k: float(v) for k, v in data.items()}
+                                             for node, data in state['ledgers'].items()})
+                        for shard, state in list(ledger.shard_state.items())}  # Straggler fallbacks
+    }
+    return meta, {}
+
+def capture_optimizer(optimizer):
+    state = optimizer.model.policy.state_dict()
+    arrays = {f"optimizer/policy/{k}": v.detach().cpu().numpy().copy() for k, v in state.items()}
+    meta = {
+        'num_regions': optimizer.num_regions,
+        'regions': optimizer.regions,
+        'max_steps': optimizer.max_steps,
+        'model_path': optimizer.model_path,
+        'fairness_threshold': optimizer.fairness_threshold,
+        'sensor_capacity': optimizer.sensor_capacity.tolist(),
+        'policy_keys': list(state),
+        'rng_state': optimizer.rng.bit_generator.state
+    }
+    return meta, arrays
+
+def capture(simulator=None, ledger=None, optimizer=None):
+    """Snapshot whichever components are given into (sections, arrays)."""
+    sections, arrays = {}, {}
+    for name, component, capture_fn in (('iot', simulator, capture_iot), ('ledger', ledger, capture_ledger),
+                                        ('optimizer', optimizer, capture_optimizer)):
+        if component is not None:
+            sections[name], section_arrays = capture_fn(component)
+            arrays.update(section_arrays)
+    return sections, arrays
+
+# Bundle I/O
+
+def write_bundle(path, sections, arrays):
+    """Write one versioned bundle atomically (temp file + rename)."""
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        offset = _align(offset)
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    header = json.dumps({'version': FORMAT_VERSION, 'created': time.time(),
+                         'sections': sections, 'arrays': layout}).encode()
+    data_start = _align(PREAMBLE.size + len(header))
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+    return path
+
+def read_bundle(path, mmap=True):
+    """Read a bundle; with mmap=True arrays are read-only views into the file, paged in on first touch."""
+    with open(path, 'rb') as f:
+        magic, version, _, header_len = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Gaia snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version} (expected {FORMAT_VERSION})")
+        header = json.loads(f.read(header_len))
+    data_start = _align(PREAMBLE.size + header_len)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+        count = int(np.prod(shape)) if shape else 1
+        if mmap and count:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=data_start + spec['offset'], shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=count, offset=data_start + spec['offset']).reshape(shape)
+    return header['sections'], arrays
+
+# Restore
+
+class LazySensors(MutableMapping):
+    """IoTSimulator.sensors backed by snapshot arrays: a sensor's record is built the first time it is read."""
+    def __init__(self, sensor_ids, build):
+        self._rows = dict(zip(sensor_ids, range(len(sensor_ids))))  # sensor_id -> array row (None once replaced)
+        self._records = {}
+        self._build = build
+
+    def __getitem__(self, sensor_id):
+        record = self._records.get(sensor_id)
+        if record is None:
+            record = self._records[sensor_id] = self._build(self._rows[sensor_id])
+        return record
+
+    def __setitem__(self, sensor_id, record):
+        self._rows.setdefault(sensor_id, None)
+        self._records[sensor_id] = record
+
+    def __delitem__(self, sensor_id):
+        del self._rows[sensor_id]
+        self._records.pop(sensor_id, None)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, sensor_id):
+        return sensor_id in self._rows
+
+def restore_iot(meta, arrays):
+    from simulations.iot_simulator import IoTSimulator, DigitalTwin
+    simulator = IoTSimulator(num_sensors=0, planetary_scale=meta['planetary_scale'], regions_file=meta['regions_file'])
+    simulator.rng.bit_generator.state = meta['rng_state']
+    location, data, twin = arrays['iot/location'], arrays['iot/data'], arrays['iot/twin']
+    anomaly, status, twin_type = arrays['iot/anomaly'], arrays['iot/status'], arrays['iot/twin_type']
+    statuses, twin_types = meta['statuses'], meta['twin_types']
+    bodies, body = meta.get('bodies', [DEFAULT_BODY]), arrays.get('iot/body')  # Older bundles are all on Earth
+
+    def build(i):  # Reads one row of each (possibly memory-mapped) array
+        lat, lon = location[i].tolist()
+        water, energy, minerals = data[i].tolist()
+        level, flow_rate = twin[i].tolist()
+        return {
+            'location': (lat, lon),
+            'body': bodies[int(body[i])] if body is not None else DEFAULT_BODY,
+            'data': {'water_level': water, 'energy_usage': energy, 'minerals_stock': minerals},
+            'twin': DigitalTwin(twin_types[int(twin_type[i])], {'level': level, 'flow_rate': flow_rate}, simulator.rng),
+            'anomaly_score': float(anomaly[i]),
+            'network_status': statuses[int(status[i])]
+        }
+    simulator.sensors = LazySensors(meta['sensor_ids'], build)
+    simulator.num_sensors = len(simulator.sensors)
+    simulator.anomaly_detector = meta['anomaly_detector']
+    simulator.consensus_log = meta['consensus_log']
+    return simulator
+
+def restore_ledger(meta, arrays):
+    from simulations.quantum_ledger import QuantumLedger
+    ledger = QuantumLedger(num_qubits=meta['num_qubits'], nodes=meta['nodes'], shard_workers=meta.get('shard_workers'),
+                           shard_deadline=meta.get('shard_deadline'))
+    ledger.rng.bit_generator.state = meta['rng_state']
+    ledger.ledger.update(meta['ledger'])
+    ledger.merkle_tree = meta['merkle_tree']
+    ledger.consensus_log = meta['consensus_log']
+    ledger.shard_state = meta.get('shard_state', {})
+    return ledger
+
+def restore_optimizer(meta, arrays):
+    import torch
+    from simulations.ai_optimizer import ResourceOptimizer
+    optimizer = ResourceOptimizer(num_regions=meta['num_regions'], model_path=meta['model_path'],
+                                  max_steps=meta['max_steps'], regions=meta.get('regions'),
+                                  sensor_capacity=meta.get('sensor_capacity', SENSOR_CAPACITY))
+    optimizer.rng.bit_generator.state = meta['rng_state']
+    optimizer.fairness_threshold = meta['fairness_threshold']
+    state = {k: torch.from_numpy(np.array(arrays[f"optimizer/policy/{k}"])) for k in meta['policy_keys']}
+    optimizer.model.policy.load_state_dict(state)
+    return optimizer
+
+def save_snapshot(path, simulator=None, ledger=None, optimizer=None):
+    """Capture and write synchronously."""
+    sections, arrays = capture(simulator, ledger, optimizer)
+    return write_bundle(path, sections, arrays)
+
+def load_snapshot(path, mmap=True):
+    """Rebuild every component stored in the bundle: {'iot': IoTSimulator, 'ledger': ..., 'optimizer': ...}."""
+    sections, arrays = read_bundle(path, mmap)
+    restorers = {'iot': restore_iot, 'ledger': restore_ledger, 'optimizer': restore_optimizer}
+    return {name: restorers[name](meta, arrays) for name, meta in sections.items()}
+
+class SnapshotWriter:
+    """Background snapshots: state is copied on the caller's thread, serialization and disk I/O happen off it."""
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gaia-snapshot")
+        self._lock = threading.Lock()
+        self.last_future = None
+
+    def save(self, path, simulator=None, ledger=None, optimizer=None):
+        sections, arrays = capture(simulator, ledger, optimizer)
+        with self._lock:
+            self.last_future = self._executor.submit(write_bundle, path, sections, arrays)
+            return self.last_future
+
+    def wait(self):
+        if self.last_future is not None:
+            self.last_future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+# Example Usage (Runnable Standalone)
+if __name__ == "__main__":
+    import asyncio
+    from simulations.iot_simulator import IoTSimulator
+
+    simulator = IoTSimulator(num_sensors=1000, seed=2065)
+    asyncio.run(simulator.simulate_tracking())
+    writer = SnapshotWriter()
+    writer.save("gaia_snapshot.bin", simulator=simulator)
+    asyncio.run(simulator.simulate_tracking())  # Keeps running while the snapshot is written
+    writer.wait()
+
+    start = time.perf_counter()
+    restored = load_snapshot("gaia_snapshot.bin")["iot"]
+    print(f"Restored {restored.num_sensors} sensors in {(time.perf_counter() - start) * 1e3:.1f} ms")
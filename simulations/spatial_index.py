@@ -0,0 +1,184 @@
+import json
+import math
+from collections import defaultdict
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_BODY = 'earth'  # Sensors without a 'body' field are on Earth
+SENSOR_FIELDS = ('water_level', 'energy_usage', 'minerals_stock')
+SENSOR_CAPACITY = (1000.0, 500.0, 10000.0)  # Full-scale reading per field: reading / capacity is a fill level
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between points given in degrees (broadcasts over numpy arrays)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def region_body(region):
+    """Celestial body a region lies on: its 'body' field, else the id prefix (earth_africa -> earth)."""
+    return region.get('body', region['id'].split('_', 1)[0])
+
+class RegionIndex:
+    """Lat/long grid index of sensors, each assigned to its nearest planetary region."""
+    def __init__(self, regions, cell_deg=5.0, capacity=1024):
+        self.region_ids = [r['id'] for r in regions]
+        self.region_coords = np.array([r['coordinates'] for r in regions], dtype=np.float64)  # (R, 2) lat, lon
+        self.region_bodies = np.array([region_body(r) for r in regions])  # Lat/long only compare on the same body
+        self.cell_deg = cell_deg
+        self.ids = []  # slot -> sensor_id (dense; removals swap in the last slot)
+        self.slots = {}  # sensor_id -> slot
+        self.bodies = {}  # sensor_id -> body, for sensors off DEFAULT_BODY
+        self.coords = np.empty((capacity, 2), dtype=np.float64)
+        self.region_of = np.empty(capacity, dtype=np.intp)
+        self.cells = defaultdict(set)  # (row, col) -> slots
+
+    @classmethod
+    def from_regions_file(cls, path='data/planetary_regions.json', **kwargs):
+        with open(path) as f:
+            return cls(json.load(f)['regions'], **kwargs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell(self, lat, lon):
+        rows, cols = int(math.ceil(180 / self.cell_deg)), int(math.ceil(360 / self.cell_deg))
+        return (min(int((lat + 90) // self.cell_deg), rows - 1), int((lon + 180) // self.cell_deg) % cols)
+
+    def _nearest_region(self, lat, lon, bodies):
+        """Vectorized nearest region on each sensor's own body for arrays of sensor coordinates."""
+        bodies = np.asarray(bodies)
+        missing = set(bodies.tolist()) - set(self.region_bodies.tolist())
+        if missing:
+            raise ValueError(f"No planetary region on {', '.join(sorted(missing))}")
+        distances = haversine_km(np.asarray(lat)[:, None], np.asarray(lon)[:, None],
+                                 self.region_coords[None, :, 0], self.region_coords[None, :, 1])
+        distances[bodies[:, None] != self.region_bodies[None, :]] = np.inf
+        return distances.argmin(axis=1)
+
+    def _grow(self, needed):
+        if needed > len(self.coords):
+            capacity = max(needed, 2 * len(self.coords))
+            self.coords = np.resize(self.coords, (capacity, 2))
+            self.region_of = np.resize(self.region_of, capacity)
+
+    def upsert_many(self, locations, bodies=None):
+        """Add or move sensors: {sensor_id: (lat, lon)}, optionally {sensor_id: body}. Only new or moved sensors are re-indexed."""
+        bodies = bodies or {}
+        changed = [(sid, loc, bodies.get(sid, DEFAULT_BODY)) for sid, loc in locations.items()]
+        changed = [(sid, loc, body) for sid, loc, body in changed
+                   if sid not in self.slots or tuple(self.coords[self.slots[sid]]) != tuple(loc)
+                   or self.bodies.get(sid, DEFAULT_BODY) != body]
+        if not changed:
+            return 0
+        coords = np.array([loc for _, loc, _ in changed], dtype=np.float64).reshape(-1, 2)
+        regions = self._nearest_region(coords[:, 0], coords[:, 1], [body for _, _, body in changed])
+        self._grow(len(self.ids) + len(changed))
+        for (sensor_id, _, body), (lat, lon), region in zip(changed, coords, regions):
+            slot = self.slots.get(sensor_id)
+            if slot is None:
+                slot = self.slots[sensor_id] = len(self.ids)
+                self.ids.append(sensor_id)
+            else:
+                self.cells[self._cell(*self.coords[slot])].discard(slot)
+            self.coords[slot] = (lat, lon)
+            self.region_of[slot] = region
+            self.cells[self._cell(lat, lon)].add(slot)
+            if body == DEFAULT_BODY:
+                self.bodies.pop(sensor_id, None)
+            else:
+                self.bodies[sensor_id] = body
+        return len(changed)
+
+    def upsert(self, sensor_id, location, body=DEFAULT_BODY):
+        return self.upsert_many({sensor_id: location}, {sensor_id: body})
+
+    def remove(self, sensor_id):
+        slot = self.slots.pop(sensor_id)
+        self.bodies.pop(sensor_id, None)
+        last = len(self.ids) - 1
+        self.cells[self._cell(*self.coords[slot])].discard(slot)
+        if slot != last:  # Keep arrays dense: move the last sensor into the freed slot
+            moved = self.ids[last]
+            self.cells[self._cell(*self.coords[last])].discard(last)
+            self.cells[self._cell(*self.coords[last])].add(slot)
+            self.coords[slot], self.region_of[slot] = self.coords[last], self.region_of[last]
+            self.ids[slot], self.slots[moved] = moved, slot
+        self.ids.pop()
+
+    def sync(self, sensors):
+        """Bring the index in line with an IoTSimulator.sensors dict (adds, moves and removals)."""
+        for sensor_id in [sid for sid in self.ids if sid not in sensors]:
+            self.remove(sensor_id)
+        return self.upsert_many({sid: s['location'] for sid, s in sensors.items()},
+                                {sid: s['body'] for sid, s in sensors.items() if s.get('body', DEFAULT_BODY) != DEFAULT_BODY})
+
+    def region_of_sensor(self, sensor_id):
+        return self.region_ids[self.region_of[self.slots[sensor_id]]]
+
+    def aggregate(self, values):
+        """One group-by over all sensors: values (N, k) in slot order -> per-region sums, counts and means."""
+        n, num_regions = len(self.ids), len(self.region_ids)
+        values = np.asarray(values, dtype=np.float64).reshape(n, -1)
+        groups = self.region_of[:n]
+        counts = np.bincount(groups, minlength=num_regions)
+        sums = np.stack([np.bincount(groups, weights=values[:, j], minlength=num_regions)
+                         for j in range(values.shape[1])], axis=1)
+        means = np.divide(sums, counts[:, None], out=np.zeros_like(sums), where=counts[:, None] > 0)
+        return {'sums': sums, 'counts': counts, 'means': means}
+
+    def aggregate_sensors(self, sensors, fields=SENSOR_FIELDS, how='means'):
+        """Per-region (R, len(fields)) matrix from IoTSimulator sensor readings."""
+        values = [[sensors[sid]['data'][f] for f in fields] for sid in self.ids]
+        return self.aggregate(values)[how]
+
+    def _candidates(self, lat_min, lat_max, lon_ranges):
+        rows = range(self._cell(max(lat_min, -90), 0)[0], self._cell(min(lat_max, 90), 0)[0] + 1)
+        slots = []
+        for lon_min, lon_max in lon_ranges:
+            cols = range(self._cell(0, lon_min)[1], self._cell(0, min(lon_max, 180 - 1e-9))[1] + 1)
+            for row in rows:
+                for col in cols:
+                    slots.extend(self.cells.get((row, col), ()))
+        return np.unique(np.array(slots, dtype=np.intp))
+
+    def query_bbox(self, lat_min, lat_max, lon_min, lon_max):
+        """Sensor ids inside a lat/long box; lon_min > lon_max wraps across the antimeridian."""
+        lon_ranges = [(lon_min, lon_max)] if lon_min <= lon_max else [(lon_min, 180), (-180, lon_max)]
+        slots = self._candidates(lat_min, lat_max, lon_ranges)
+        if not len(slots):
+            return []
+        lat, lon = self.coords[slots, 0], self.coords[slots, 1]
+        in_lon = (lon >= lon_min) & (lon <= lon_max) if lon_min <= lon_max else (lon >= lon_min) | (lon <= lon_max)
+        return [self.ids[s] for s in slots[(lat >= lat_min) & (lat <= lat_max) & in_lon]]
+
+    def query_radius(self, lat, lon, radius_km):
+        """Sensor ids within `radius_km` of (lat, lon)."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = lat - dlat, lat + dlat
+        if lat_min <= -90 or lat_max >= 90 or dlat >= 90:
+            lon_ranges = [(-180, 180)]  # Circle covers a pole: every longitude is a candidate
+        else:
+            dlon = math.degrees(math.asin(min(1.0, math.sin(math.radians(dlat)) / math.cos(math.radians(lat)))))
+            lo, hi = lon - dlon, lon + dlon
+            if lo < -180:
+                lon_ranges = [(lo + 360, 180), (-180, hi)]
+            elif hi > 180:
+                lon_ranges = [(lo, 180), (-180, hi - 360)]
+            else:
+                lon_ranges = [(lo, hi)]
+        slots = self._candidates(lat_min, lat_max, lon_ranges)
+        if not len(slots):
+            return []
+        distances = haversine_km(lat, lon, self.coords[slots, 0], self.coords[slots, 1])
+        return [self.ids[s] for s in slots[distances <= radius_km]]
+
+# Example Usage (Runnable Standalone)
+if __name__ == "__main__":
+    from simulations.iot_simulator import IoTSimulator
+
+    simulator = IoTSimulator(num_sensors=1000, seed=2065)
+    index = RegionIndex.from_regions_file()
+    index.sync(simulator.sensors)
+    print("Sensors per region:", dict(zip(index.region_ids, index.aggregate_sensors(simulator.sensors, how='counts').tolist())))
+    print("Region means:", index.aggregate_sensors(simulator.sensors).round(1).tolist())
+    print("Sensors within 1000 km of North America centroid:", len(index.query_radius(40.0, -100.0, 1000)))
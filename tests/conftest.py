@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Python tests import the repo packages (simulations, data, monitoring, security, utils) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+import io
+import os
+import struct
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.exceptions import InvalidTag
+from security.bulk_encryption import BulkSession, CHUNK_FRAME, MAX_CHUNK_SIZE, STREAM_HEADER
+
+def sealed_stream(session, data, chunk_size=1024):
+    out = io.BytesIO()
+    session.encrypt_stream(io.BytesIO(data), out, chunk_size=chunk_size)
+    return out.getvalue()
+
+def test_message_round_trip_through_header():
+    secret = os.urandom(32)
+    sender = BulkSession.create(secret, kem_ciphertext=b"kem")
+    receiver = BulkSession.from_header(sender.header(), lambda kem_ciphertext: secret)
+    sealed = [sender.encrypt_message(f"reading {i}".encode(), aad=b"iot") for i in range(3)]
+    assert [receiver.decrypt_message(s, aad=b"iot") for s in sealed] == [b"reading 0", b"reading 1", b"reading 2"]
+
+def test_receiver_session_cannot_encrypt():
+    secret = os.urandom(32)
+    sender = BulkSession.create(secret)
+    receiver = BulkSession.from_header(sender.header(), lambda kem_ciphertext: secret)
+    with pytest.raises(RuntimeError):
+        receiver.encrypt_message(b"reply")  # Would reuse the sender's first nonce
+    with pytest.raises(RuntimeError):
+        receiver.encrypt_stream(io.BytesIO(b"reply"), io.BytesIO())
+
+def test_stream_round_trip():
+    session = BulkSession.create(os.urandom(32))
+    data = os.urandom(5000)
+    restored = io.BytesIO()
+    assert session.decrypt_stream(io.BytesIO(sealed_stream(session, data)), restored) == 5
+    assert restored.getvalue() == data
+
+def test_tampered_message_is_rejected():
+    session = BulkSession.create(os.urandom(32))
+    sealed = bytearray(session.encrypt_message(b"water: 1200"))
+    sealed[-1] ^= 1
+    with pytest.raises(InvalidTag):
+        session.decrypt_message(bytes(sealed))
+
+def test_truncated_stream_is_rejected():
+    session = BulkSession.create(os.urandom(32))
+    stream = sealed_stream(session, os.urandom(3000))
+    first_frame = STREAM_HEADER.size + CHUNK_FRAME.size + CHUNK_FRAME.unpack_from(stream, STREAM_HEADER.size)[0]
+    with pytest.raises(ValueError):
+        session.decrypt_stream(io.BytesIO(stream[:first_frame]), io.BytesIO())
+
+def test_oversized_frame_length_is_rejected():
+    session = BulkSession.create(os.urandom(32))
+    stream = bytearray(sealed_stream(session, os.urandom(3000)))
+    struct.pack_into("<I", stream, STREAM_HEADER.size, 2 ** 32 - 1)
+    with pytest.raises(ValueError):
+        session.decrypt_stream(io.BytesIO(bytes(stream)), io.BytesIO())
+    stream[:STREAM_HEADER.size] = STREAM_HEADER.pack(0, 2 ** 32 - 1)  # Header raised to match the frame
+    with pytest.raises(ValueError):
+        session.decrypt_stream(io.BytesIO(bytes(stream)), io.BytesIO())
+
+def test_rewritten_stream_header_is_rejected():
+    session = BulkSession.create(os.urandom(32))
+    stream = bytearray(sealed_stream(session, os.urandom(3000)))
+    stream[:STREAM_HEADER.size] = STREAM_HEADER.pack(0, MAX_CHUNK_SIZE)  # Within the cap, but not what was sealed
+    with pytest.raises(InvalidTag):
+        session.decrypt_stream(io.BytesIO(bytes(stream)), io.BytesIO())
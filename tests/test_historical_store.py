@@ -0,0 +1,71 @@
+import pytest
+from data.historical_store import HistoricalStore, DemandReplay
+
+HEADER = "timestamp,region,water_allocated,energy_allocated,miners_allocated,efficiency_score\n"
+
+def write_csv(path, rows):
+    path.write_text(HEADER + "".join(f"{ts},{region},{w},2.0,3.0,0.9\n" for ts, region, w in rows))
+    return str(path)
+
+def test_ingest_sorts_and_windows(tmp_path):
+    csv = write_csv(tmp_path / "history.csv", [
+        ("2024-01-03", "earth_africa", 30.0), ("2024-01-01", "earth_africa", 10.0),
+        ("2024-01-02", "earth_africa", 20.0), ("2024-01-01", "mars_colony", 5.0)])
+    store = HistoricalStore(str(tmp_path / "store"))
+    assert store.ingest_csv(csv, chunksize=2)['rows'] == 4
+    assert store.regions == ["earth_africa", "mars_colony"]
+    assert store.window("earth_africa")["water_allocated"].tolist() == [10.0, 20.0, 30.0]
+    jan2 = 1704153600
+    assert store.window("earth_africa", start=jan2)["water_allocated"].tolist() == [20.0, 30.0]
+    assert store.take("earth_africa", [2, 0])[:, 0].tolist() == [30.0, 10.0]
+
+def test_failed_ingest_leaves_no_orphaned_rows(tmp_path):
+    bad = write_csv(tmp_path / "bad.csv", [
+        ("2023-01-01", "earth_africa", 1.0), ("2023-01-02", "earth_africa", 1.0), ("not a date", "earth_africa", 1.0)])
+    good = write_csv(tmp_path / "good.csv", [("2024-01-01", "earth_africa", 5.0)])
+    store = HistoricalStore(str(tmp_path / "store"))
+    with pytest.raises(Exception):
+        store.ingest_csv(bad, chunksize=2)  # First chunk is written before the second one fails
+    store.ingest_csv(good)
+    assert store.window("earth_africa")["water_allocated"].tolist() == [5.0]
+    assert HistoricalStore(store.store_dir).window("earth_africa")["water_allocated"].tolist() == [5.0]
+
+def test_replay_maps_env_regions_by_id(tmp_path):
+    csv = write_csv(tmp_path / "history.csv", [
+        ("2024-01-01", "earth_africa", 10.0), ("2024-01-01", "mars_colony", 30.0)])
+    store = HistoricalStore(str(tmp_path / "store"))
+    store.ingest_csv(csv)
+    demand = DemandReplay(store, seed=1).sample(2, 1, region_ids=["mars_colony", "earth_africa"])
+    assert demand[0, 0, 0] == pytest.approx(3 * demand[0, 1, 0])
+
+def test_opening_a_store_does_not_modify_it(tmp_path):
+    store = HistoricalStore(str(tmp_path / "store"))
+    store.ingest_csv(write_csv(tmp_path / "good.csv", [("2024-01-01", "earth_africa", 5.0)]))
+    column = tmp_path / "store" / "earth_africa" / "water_allocated.bin"
+    with open(column, 'ab') as f:
+        f.write(b"\0" * 16)  # Rows a crashed writer appended but never committed
+    reader = HistoricalStore(store.store_dir)
+    assert column.stat().st_size == 24
+    assert reader.window("earth_africa")["water_allocated"].tolist() == [5.0]
+
+def test_failed_sort_leaves_committed_rows_in_place(tmp_path, monkeypatch):
+    store = HistoricalStore(str(tmp_path / "store"))
+    store.ingest_csv(write_csv(tmp_path / "first.csv", [
+        ("2024-01-02", "earth_africa", 20.0), ("2024-01-03", "earth_africa", 30.0)]))
+    sort_region = store._sort_region
+
+    def failing_sort(region):
+        if region == "mars_colony":
+            raise OSError("disk full")
+        sort_region(region)
+    monkeypatch.setattr(store, "_sort_region", failing_sort)
+    late = write_csv(tmp_path / "late.csv", [
+        ("2024-01-01", "earth_africa", 10.0), ("2024-01-02", "mars_colony", 2.0), ("2024-01-01", "mars_colony", 1.0)])
+    with pytest.raises(OSError):
+        store.ingest_csv(late)
+    assert store.window("earth_africa")["water_allocated"].tolist() == [20.0, 30.0]
+    monkeypatch.undo()
+    store.ingest_csv(late)
+    assert store.window("earth_africa")["water_allocated"].tolist() == [10.0, 20.0, 30.0]
+    assert store.window("mars_colony")["water_allocated"].tolist() == [1.0, 2.0]
+    assert not list((tmp_path / "store").glob("*/*.sorted"))
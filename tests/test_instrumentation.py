@@ -0,0 +1,74 @@
+import asyncio
+from monitoring.instrumentation import Instrumentation, LATENCY_BUCKETS
+
+def test_disabled_registry_passes_calls_through():
+    registry = Instrumentation(enabled=False)
+
+    @registry.timed("sync.stage", payload=lambda n: n)
+    def work(n):
+        return n * 2
+
+    @registry.timed("async.stage")
+    async def async_work(n):
+        return n + 1
+
+    assert work(21) == 42
+    assert asyncio.run(async_work(1)) == 2
+    with registry.stage("block.stage"):
+        pass
+    assert registry.snapshot()['stages'] == {}
+
+def test_histogram_buckets_are_cumulative():
+    registry = Instrumentation(enabled=True)
+    for latency in (0.0001, 0.003, 0.003, 0.2, 60.0):
+        registry.record("ledger.sync", latency, payload=5)
+    stats = registry.snapshot()['stages']['ledger.sync']
+    buckets = stats['latency_buckets']
+    assert list(buckets) == [str(b) for b in LATENCY_BUCKETS] + ['inf']
+    assert buckets['0.0005'] == 1
+    assert buckets['0.005'] == 3
+    assert buckets['0.25'] == 4
+    assert buckets['10.0'] == 4
+    assert buckets['inf'] == stats['count'] == 5
+    assert stats['payload_sum'] == 25 and stats['payload_max'] == 5
+
+def test_errors_are_counted_and_reraised():
+    registry = Instrumentation(enabled=True)
+
+    @registry.timed("iot.fail")
+    def fail():
+        raise KeyError("sensor")
+
+    try:
+        fail()
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("exception was swallowed")
+    stats = registry.snapshot()['stages']['iot.fail']
+    assert stats['count'] == 1 and stats['errors'] == 1
+
+def test_prometheus_text_format():
+    registry = Instrumentation(enabled=True)
+    registry.record("ai.optimize", 0.002, payload=3)
+    lines = registry.prometheus_text().splitlines()
+    assert "# TYPE gaia_stage_latency_seconds histogram" in lines
+    assert 'gaia_stage_latency_seconds_bucket{stage="ai.optimize",le="0.001"} 0' in lines
+    assert 'gaia_stage_latency_seconds_bucket{stage="ai.optimize",le="0.0025"} 1' in lines
+    assert 'gaia_stage_latency_seconds_bucket{stage="ai.optimize",le="+Inf"} 1' in lines
+    assert 'gaia_stage_latency_seconds_count{stage="ai.optimize"} 1' in lines
+    assert 'gaia_stage_errors_total{stage="ai.optimize"} 0' in lines
+    assert 'gaia_stage_payload_total{stage="ai.optimize"} 3' in lines
+    for line in lines:
+        assert line.startswith('#') or len(line.split(' ')) == 2  # Sample lines are "<metric>{labels} <value>"
+
+def test_failing_payload_does_not_break_the_call():
+    registry = Instrumentation(enabled=True)
+
+    @registry.timed("utils.load", payload=lambda data: len(data))
+    def load(data):
+        return "loaded"
+
+    assert load(42) == "loaded"  # len(42) raises TypeError inside the payload callable
+    stats = registry.snapshot()['stages']['utils.load']
+    assert stats['count'] == 1 and stats['errors'] == 0 and stats['payload_sum'] == 0
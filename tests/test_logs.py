@@ -0,0 +1,65 @@
+import json
+import numpy as np
+import pytest
+from monitoring.logs import LogAggregator
+
+def read_payloads(path):
+    with open(path) as f:
+        return [json.loads(line.split(' - INFO - ', 1)[1]) for line in f]
+
+def test_chain_verifies_across_batches_and_reopen(tmp_path):
+    log_file = str(tmp_path / "gaia_logs.json")
+    aggregator = LogAggregator(log_file=log_file, batch_size=4)
+    for i in range(10):
+        aggregator.log_event('quantum_sync', {'i': i})
+    aggregator.close()
+    reopened = LogAggregator(log_file=log_file, batch_size=4)  # Chain resumes from the last batch record
+    reopened.log_event('iot_anomaly', {'sensor': 'sensor_1'})
+    reopened.close()
+    assert reopened.verify_chain()
+    assert [e['data']['batch'] for e in read_payloads(log_file) if e['event_type'] == 'log_batch'] == [1, 2, 3, 4]
+
+def test_tampered_entry_breaks_chain(tmp_path):
+    log_file = tmp_path / "gaia_logs.json"
+    aggregator = LogAggregator(log_file=str(log_file))
+    aggregator.log_event('quantum_sync', {'latency': 2.5})
+    aggregator.close()
+    log_file.write_text(log_file.read_text().replace('2.5', '9.5'))
+    assert not aggregator.verify_chain()
+
+def test_shutdown_drains_in_full_batches(tmp_path):
+    log_file = str(tmp_path / "gaia_logs.json")
+    aggregator = LogAggregator(log_file=log_file, batch_size=256, flush_interval=60)
+    for i in range(1000):
+        aggregator.log_event('quantum_sync', {'i': i})
+    aggregator.close()
+    stats = aggregator.get_stats()
+    assert stats['written'] == 1000
+    assert stats['batches'] == 4
+    assert aggregator.verify_chain()
+
+def test_unserializable_payload_fails_in_caller(tmp_path):
+    aggregator = LogAggregator(log_file=str(tmp_path / "gaia_logs.json"))
+    with pytest.raises(TypeError):
+        aggregator.log_event('iot_reading', {'level': np.float32(1.0)})
+    aggregator.log_event('iot_reading', {'level': 1.0})
+    aggregator.flush()  # Writer is still alive and the queue drains
+    assert aggregator.get_stats()['written'] == 1
+    aggregator.close()
+
+def test_aggregate_anomalies_sees_queued_events(tmp_path):
+    aggregator = LogAggregator(log_file=str(tmp_path / "gaia_logs.json"), flush_interval=60)
+    aggregator.log_event('iot_anomaly', {'sensor': 'sensor_1', 'score': 0.9})
+    assert [e['data']['sensor'] for e in aggregator.aggregate_anomalies()] == ['sensor_1']
+    aggregator.close()
+
+def test_torn_last_line_does_not_break_reopen(tmp_path):
+    log_file = tmp_path / "gaia_logs.json"
+    aggregator = LogAggregator(log_file=str(log_file))
+    aggregator.log_event('quantum_sync', {'latency': 2.5})
+    aggregator.close()
+    with open(log_file, 'a') as f:
+        f.write('2065-01-01 00:00:00,000 - INFO - {"event_type": "log_batch", "data": {"bat')
+    reopened = LogAggregator(log_file=str(log_file))
+    assert reopened.get_stats()['batches'] == 1
+    reopened.close()
@@ -0,0 +1,68 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+
+pytest.importorskip("qiskit")
+
+from simulations import quantum_ledger
+from simulations.quantum_ledger import QuantumLedger, _weighted_median
+
+gates = {}  # shard -> threading.Event the fake shard round waits on
+
+def fake_shard_round(shard_id, shard_data, seed):
+    gate = gates.get(shard_id)
+    if gate is not None:
+        gate.wait(5)
+    water = [d["water"] for d in shard_data.values()]
+    return {"shard": shard_id, "ledgers": shard_data, "summary": {"water": float(np.median(water))},
+            "merkle_root": f"{shard_id}-{seed}", "nodes": len(shard_data)}
+
+@pytest.fixture
+def ledger(monkeypatch):
+    monkeypatch.setattr(quantum_ledger, "_shard_round", fake_shard_round)
+    ledger = QuantumLedger(seed=1, shard_deadline=0.2)
+    ledger._shard_pool = ThreadPoolExecutor(max_workers=8)  # Threads see the patched round; no pickling
+    yield ledger
+    for gate in gates.values():
+        gate.set()
+    ledger.close()
+    gates.clear()
+
+def test_weighted_median():
+    assert _weighted_median([1.0, 2.0, 3.0], [1, 1, 1]) == 2.0
+    assert _weighted_median([10.0, 1.0, 2.0], [5, 1, 1]) == 10.0
+    assert _weighted_median([1.0, 2.0, 10.0], [3, 1, 1]) == 1.0
+
+def test_stragglers_fall_back_to_their_latest_round(ledger):
+    nodes = {"earth_a": {"water": 10.0}, "earth_b": {"water": 20.0}, "mars_colony": {"water": 100.0}}
+    ledger.multi_node_sync(nodes, hierarchical=True)
+    first_root = ledger.merkle_tree
+    gates["mars"], gates["luna"] = threading.Event(), threading.Event()
+    nodes = {"earth_a": {"water": 12.0}, "earth_b": {"water": 22.0}, "mars_colony": {"water": 200.0},
+             "luna_base": {"water": 1.0}}
+    synced, votes = ledger.multi_node_sync(nodes, hierarchical=True)
+    entry = ledger.consensus_log[-1]
+    assert {s: v["status"] for s, v in entry["shards"].items()} == {"earth": "fresh", "mars": "stale", "luna": "missing"}
+    assert entry["stragglers"] == ["luna", "mars"]
+    assert entry["quorum"] == pytest.approx(0.5) and entry["stale"] == pytest.approx(0.25)
+    assert votes["water"] == 17.0  # Earth's fresh median outweighs Mars' round-1 summary two nodes to one
+    assert synced["mars_colony"] == {"water": 100.0} and "luna_base" not in synced
+    assert ledger.merkle_tree != first_root
+    gates["mars"].set()
+    for _ in range(50):
+        if ledger.shard_state["mars"]["round"] == 2:
+            break
+        time.sleep(0.05)
+    assert ledger.shard_state["mars"]["round"] == 2  # The late result replaces the fallback for the next round
+    assert ledger.shard_state["mars"]["summary"] == {"water": 200.0}
+
+def test_round_without_any_summary_keeps_previous_root(ledger):
+    ledger.merkle_tree = "previous-root"
+    gates["earth"] = threading.Event()
+    with pytest.raises(RuntimeError):
+        ledger.multi_node_sync({"earth_a": {"water": 1.0}}, hierarchical=True)
+    assert ledger.merkle_tree == "previous-root"
+    assert ledger.consensus_log[-1]["shards"]["earth"]["status"] == "missing"
+    assert ledger.consensus_log[-1]["quorum"] == 0.0
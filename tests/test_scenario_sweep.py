@@ -0,0 +1,30 @@
+import math
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from simulations.ai_optimizer import SUPPLY_RATE, PlanetaryResourceEnv
+from simulations.scenario_sweep import ScenarioSweep, load_regions, load_scenarios
+
+def test_sweep_aggregates_are_finite_and_drought_causes_shortages():
+    summary = ScenarioSweep(model_path=None, seeds_per_scenario=8, max_steps=100, workers=2, chunk_size=4).run()
+    for metrics in summary["scenarios"].values():
+        for stats in metrics.values():
+            assert math.isfinite(stats["mean"]) and math.isfinite(stats["std"])
+    assert summary["scenarios"]["Global Drought 2065"]["shortage"]["mean"] > 0
+    assert summary["scenarios"]["Baseline"]["shortage"]["mean"] < summary["scenarios"]["Global Drought 2065"]["shortage"]["mean"]
+
+def test_allocation_redistributes_pooled_stock():
+    env = PlanetaryResourceEnv(regions=load_regions(), seed=1)
+    env.reset()
+    env.demand_scale = 0.0  # Isolate redistribution from usage
+    pooled = env.state.sum(axis=0)
+    env.step(env.action_space.high)  # Every region asks for everything
+    renewed = SUPPLY_RATE * env.supply.sum(axis=0)
+    assert env.state.sum(axis=0) == pytest.approx(pooled + renewed)
+
+def test_drought_cuts_supply_of_affected_regions():
+    drought = next(s for s in load_scenarios() if s["name"] == "Global Drought 2065")
+    env = PlanetaryResourceEnv(regions=load_regions(), scenario=drought, seed=1)
+    africa = env.region_ids.index("earth_africa")
+    assert env.supply[africa, 0] == pytest.approx(0.3 * env.capacity[africa, 0])
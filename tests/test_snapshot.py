@@ -0,0 +1,98 @@
+import asyncio
+import numpy as np
+import pytest
+from simulations.iot_simulator import IoTSimulator
+from simulations.snapshot import (FORMAT_VERSION, PREAMBLE, LazySensors, SnapshotWriter, load_snapshot,
+                                  save_snapshot)
+
+def sensor_view(sensor):
+    return (sensor['location'], sensor['body'], dict(sensor['data']), dict(sensor['twin'].state), sensor['twin'].type,
+            sensor['anomaly_score'], sensor['network_status'])
+
+def test_iot_round_trip(tmp_path):
+    simulator = IoTSimulator(num_sensors=50, seed=3)
+    asyncio.run(simulator.simulate_tracking())
+    simulator.add_sensor("rover_1", (4.5, 137.4), body="mars")
+    path = save_snapshot(str(tmp_path / "snap.bin"), simulator=simulator)
+    for mmap in (True, False):
+        restored = load_snapshot(path, mmap=mmap)["iot"]
+        assert list(restored.sensors) == list(simulator.sensors)
+        assert all(sensor_view(restored.sensors[s]) == sensor_view(simulator.sensors[s]) for s in simulator.sensors)
+        assert restored.rng.bit_generator.state == simulator.rng.bit_generator.state
+        assert restored.consensus_log == simulator.consensus_log
+        assert restored.get_region_index().region_of_sensor("rover_1") == "mars_colony"
+
+def test_lazy_sensors_build_once_and_behave_like_a_dict():
+    built = []
+
+    def build(row):
+        built.append(row)
+        return {'row': row}
+    sensors = LazySensors(["a", "b", "c"], build)
+    assert len(sensors) == 3 and "b" in sensors and "z" not in sensors and built == []
+    assert sensors["b"] is sensors["b"] and built == [1]
+    sensors["d"] = {'row': None}  # New sensors are stored as given
+    del sensors["a"]
+    assert list(sensors) == ["b", "c", "d"] and "a" not in sensors
+    assert sensors["d"] == {'row': None} and sensors["c"] == {'row': 2}
+    assert built == [1, 2]
+    with pytest.raises(KeyError):
+        sensors["a"]
+
+def test_bad_magic_and_version_are_rejected(tmp_path):
+    path = save_snapshot(str(tmp_path / "snap.bin"), simulator=IoTSimulator(num_sensors=3, seed=1))
+    raw = bytearray(open(path, 'rb').read())
+    magic, version, reserved, header_len = PREAMBLE.unpack_from(raw)
+    for patched in (PREAMBLE.pack(b"NOTGAIA!", version, reserved, header_len),
+                    PREAMBLE.pack(magic, FORMAT_VERSION + 1, reserved, header_len)):
+        raw[:PREAMBLE.size] = patched
+        bad = tmp_path / "bad.bin"
+        bad.write_bytes(bytes(raw))
+        with pytest.raises(ValueError):
+            load_snapshot(str(bad))
+
+def test_writer_snapshots_state_at_save_time(tmp_path):
+    simulator = IoTSimulator(num_sensors=20, seed=5)
+    expected = {s: sensor_view(simulator.sensors[s]) for s in simulator.sensors}
+    writer = SnapshotWriter()
+    try:
+        future = writer.save(str(tmp_path / "snap.bin"), simulator=simulator)
+        asyncio.run(simulator.simulate_tracking())  # Keeps running while the bundle is written
+        writer.wait()
+    finally:
+        writer.close()
+    restored = load_snapshot(future.result())["iot"]
+    assert {s: sensor_view(restored.sensors[s]) for s in restored.sensors} == expected
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_ledger_shard_state_round_trip(tmp_path):
+    pytest.importorskip("qiskit")
+    from simulations.quantum_ledger import QuantumLedger
+    ledger = QuantumLedger(seed=1, shard_workers=2, shard_deadline=0.5)
+    ledger.ledger["earth_a"] = {"water": 10.0}
+    ledger.merkle_tree = "root"
+    ledger.consensus_log.append({"round": 1, "votes": {"water": 10.0}, "quorum": 1.0, "stale": 0.0})
+    ledger.shard_state["earth"] = {"shard": "earth", "round": 1, "nodes": 1, "merkle_root": "earth-root",
+                                   "summary": {"water": np.float64(10.0)}, "ledgers": {"earth_a": {"water": 10.0}}}
+    restored = load_snapshot(save_snapshot(str(tmp_path / "snap.bin"), ledger=ledger))["ledger"]
+    assert restored.shard_state == ledger.shard_state
+    assert (restored.shard_workers, restored.shard_deadline) == (2, 0.5)
+    assert restored.merkle_tree == "root" and restored.consensus_log == ledger.consensus_log
+    assert dict(restored.ledger) == dict(ledger.ledger)
+    assert restored.rng.bit_generator.state == ledger.rng.bit_generator.state
+
+def test_optimizer_policy_weights_round_trip(tmp_path):
+    pytest.importorskip("stable_baselines3")
+    torch = pytest.importorskip("torch")
+    from simulations.ai_optimizer import ResourceOptimizer
+    from simulations.scenario_sweep import load_regions
+    optimizer = ResourceOptimizer(regions=load_regions(), seed=0, max_steps=10, sensor_capacity=(10.0, 5.0, 100.0))
+    with torch.no_grad():
+        for param in optimizer.model.policy.parameters():
+            param.add_(1.0)  # Differ from a freshly initialized policy
+    restored = load_snapshot(save_snapshot(str(tmp_path / "snap.bin"), optimizer=optimizer))["optimizer"]
+    expected, actual = optimizer.model.policy.state_dict(), restored.model.policy.state_dict()
+    assert list(actual) == list(expected)
+    assert all(torch.equal(actual[k], expected[k]) for k in expected)
+    assert restored.sensor_capacity.tolist() == [10.0, 5.0, 100.0]
+    assert restored.num_regions == optimizer.num_regions and restored.regions == optimizer.regions
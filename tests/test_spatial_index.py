@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from simulations.spatial_index import RegionIndex, haversine_km
+
+REGIONS_FILE = "data/planetary_regions.json"
+
+def random_index(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    index = RegionIndex.from_regions_file(REGIONS_FILE, capacity=16)
+    locations = {f"sensor_{i}": (rng.uniform(-90, 90), rng.uniform(-180, 180)) for i in range(n)}
+    index.upsert_many(locations)
+    return index, locations
+
+def brute_force_radius(locations, lat, lon, radius_km):
+    return {sid for sid, (a, b) in locations.items() if haversine_km(lat, lon, a, b) <= radius_km}
+
+def test_radius_matches_brute_force_including_poles_and_antimeridian():
+    index, locations = random_index()
+    for lat, lon, radius in [(40.0, -100.0, 1500), (10.0, 179.0, 2000), (85.0, 0.0, 1200), (-30.0, -179.5, 800)]:
+        assert set(index.query_radius(lat, lon, radius)) == brute_force_radius(locations, lat, lon, radius)
+
+def test_bbox_wraps_across_antimeridian():
+    index, locations = random_index()
+    expected = {sid for sid, (a, b) in locations.items() if -10 <= a <= 10 and (b >= 170 or b <= -170)}
+    assert set(index.query_bbox(-10, 10, 170, -170)) == expected
+
+def test_earth_sensors_never_land_in_the_mars_colony():
+    index, _ = random_index(n=1000)
+    counts = dict(zip(index.region_ids, index.aggregate(np.zeros(len(index)))["counts"].tolist()))
+    assert counts["mars_colony"] == 0  # Its [0, 0] coordinate is on Mars, not in the Gulf of Guinea
+    assert counts["earth_north_america"] + counts["earth_africa"] == 1000
+    index.upsert("rover", (0.5, 0.5), body="mars")
+    assert index.region_of_sensor("rover") == "mars_colony"
+    with pytest.raises(ValueError):
+        index.upsert("probe", (0.0, 0.0), body="venus")
+
+def test_aggregate_after_moves_and_removals():
+    index = RegionIndex.from_regions_file(REGIONS_FILE)
+    index.upsert_many({"a": (41.0, -99.0), "b": (1.0, 21.0), "c": (2.0, 19.0)})
+    index.upsert("a", (-59.0, 171.0), body="mars")  # Shipped to the Mars colony
+    index.remove("b")
+    means = index.aggregate([[1.0], [3.0]])  # Slot order after removal: a, c
+    assert index.ids == ["a", "c"]
+    assert means["counts"].tolist() == [0, 1, 1]
+    assert means["means"][:, 0].tolist() == [0.0, 3.0, 1.0]
+    assert index.region_of_sensor("a") == "mars_colony"
@@ -1,9 +1,11 @@
 import hashlib
 import json
 from typing import List, Dict
+from monitoring.instrumentation import timed
 
 class DataHelpers:
     @staticmethod
+    @timed("data.build_merkle_tree", payload=lambda data_list: len(data_list))
     def build_merkle_tree(data_list: List[str]) -> str:
         """Build Merkle root from data list."""
         if not data_list:
@@ -29,6 +31,7 @@ class DataHelpers:
         return {k: float(v) if isinstance(v, (int, float)) else str(v) for k, v in data.items()}
 
 # Example
-helpers = DataHelpers()
-root = helpers.build_merkle_tree(["data1", "data2"])
-print("Merkle Root:", root)
+if __name__ == "__main__":
+    helpers = DataHelpers()
+    root = helpers.build_merkle_tree(["data1", "data2"])
+    print("Merkle Root:", root)